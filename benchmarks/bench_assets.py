@@ -0,0 +1,75 @@
+"""Asset memory benchmark: bytes per PortfolioAsset, legacy dict-backed dataclass vs the slotted one.
+
+Assets are built from parsed JSON, as when a project is opened, so every
+repeated tag and medium starts out as its own string object.
+
+    python benchmarks/bench_assets.py --counts 10000 100000
+"""
+import gc
+import os
+import sys
+import json
+import uuid
+import random
+import argparse
+import tracemalloc
+from typing import Optional
+from dataclasses import dataclass, field
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.models import PortfolioAsset
+
+@dataclass
+class LegacyAsset:
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    title: str = "Untitled"
+    source_path: str = ""
+    thumbnail_path: Optional[str] = None
+    description: str = ""
+    medium: str = ""
+    year: str = ""
+    link: str = ""
+    notes: str = ""
+    tags: list[str] = field(default_factory=list)
+    @classmethod
+    def from_dict(cls, data): return cls(**data)
+
+TAGS = ["portrait", "landscape", "concept", "character", "environment", "sketch", "digital", "oil", "ink", "study"]
+MEDIUMS = ["Digital", "Oil on canvas", "Watercolor", "Ink", "Charcoal", "Acrylic"]
+
+def make_document(count):
+    rnd = random.Random(1)
+    return json.dumps([{
+        "id": str(uuid.UUID(int=rnd.getrandbits(128))),
+        "title": f"Artwork {n}",
+        "source_path": f"/home/artist/Pictures/portfolio/artwork_{n:06d}.jpg",
+        "thumbnail_path": f"/home/artist/.cache/portfolio_manager_thumbs/{rnd.getrandbits(128):032x}_600.jpg",
+        "description": "", "medium": rnd.choice(MEDIUMS), "year": str(rnd.randint(2005, 2025)),
+        "link": "", "notes": "", "tags": rnd.sample(TAGS, rnd.randint(1, 4)),
+    } for n in range(count)])
+
+def measure(cls, text):
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    data = json.loads(text)
+    assets = [cls.from_dict(d) for d in data]
+    del data
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    return used, len(assets)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--counts", type=int, nargs="+", default=[10000, 100000])
+    args = ap.parse_args()
+    print(f"{'assets':>8} {'legacy B/asset':>15} {'slotted B/asset':>16} {'saved':>7}")
+    for count in args.counts:
+        text = make_document(count)
+        legacy, _ = measure(LegacyAsset, text)
+        slotted, _ = measure(PortfolioAsset, text)
+        print(f"{count:>8} {legacy / count:>15.0f} {slotted / count:>16.0f} {1 - slotted / legacy:>7.0%}")
+
+if __name__ == "__main__":
+    main()
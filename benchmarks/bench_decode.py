@@ -0,0 +1,81 @@
+"""Thumbnail/export decode benchmark: legacy full decode vs utils.decode_to_size.
+
+Image generation and each mode run in their own subprocess so peak RSS is
+measured independently (Linux carries ru_maxrss across fork/exec).
+
+    python benchmarks/bench_decode.py --count 8 --width 8000 --height 6000
+"""
+import os
+import sys
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+def make_images(folder, count, width, height):
+    from PIL import Image
+    paths = []
+    for n in range(count):
+        path = os.path.join(folder, f"large_{n}.jpg")
+        # Gradient plus noise so the JPEG has realistic entropy
+        base = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+        noise = Image.effect_noise((width, height), 40).convert("RGB")
+        Image.blend(base, noise, 0.5).save(path, "JPEG", quality=92)
+        paths.append(path)
+    return paths
+
+def legacy(path, max_px, out):
+    from PIL import Image
+    with Image.open(path) as img:
+        if img.mode in ("RGBA", "P"): img = img.convert("RGB")
+        img.thumbnail((max_px, max_px)); img.save(out, "JPEG", quality=85)
+
+def fast(path, max_px, out):
+    from src.utils import decode_to_size
+    with decode_to_size(path, max_px) as img: img.save(out, "JPEG", quality=85)
+
+def run_mode(mode, paths, max_px):
+    fn = legacy if mode == "legacy" else fast
+    out = os.path.join(tempfile.gettempdir(), f"bench_decode_{os.getpid()}.jpg")
+    start = time.perf_counter()
+    for p in paths: fn(p, max_px, out)
+    elapsed = time.perf_counter() - start
+    os.remove(out)
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{elapsed:.6f} {peak_mb:.1f}")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--count", type=int, default=8)
+    ap.add_argument("--width", type=int, default=8000)
+    ap.add_argument("--height", type=int, default=6000)
+    ap.add_argument("--_make", action="store_true", help=argparse.SUPPRESS)
+    ap.add_argument("--_run", nargs=2, help=argparse.SUPPRESS)
+    ap.add_argument("--_dir", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args._make:
+        make_images(args._dir, args.count, args.width, args.height)
+        return
+    if args._run:
+        mode, max_px = args._run
+        run_mode(mode, sorted(os.path.join(args._dir, f) for f in os.listdir(args._dir)), int(max_px))
+        return
+
+    with tempfile.TemporaryDirectory() as folder:
+        print(f"Generating {args.count} images at {args.width}x{args.height}...")
+        subprocess.run([sys.executable, __file__, "--_make", "--_dir", folder, "--count", str(args.count),
+                        "--width", str(args.width), "--height", str(args.height)], check=True)
+        print(f"{'target':>7} {'mode':>8} {'img/s':>8} {'peak RSS MB':>12}")
+        for max_px in (600, 1920):
+            for mode in ("legacy", "fast"):
+                out = subprocess.run([sys.executable, __file__, "--_run", mode, str(max_px), "--_dir", folder],
+                                     capture_output=True, text=True, check=True).stdout.split()
+                elapsed, peak = float(out[0]), float(out[1])
+                print(f"{max_px:>7} {mode:>8} {args.count / elapsed:>8.2f} {peak:>12.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Duplicate lookup benchmark: one asset's near-duplicates by linear scan vs the multi-index HammingIndex.
+
+Hashes are random, with a planted copy a few bits off for some assets, the
+case an import checks for. Also times group_duplicates over the whole set,
+which the Find Duplicates view runs.
+
+    python benchmarks/bench_dedup.py --counts 10000 50000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.dedup import HammingIndex, DUPLICATE_DISTANCE, group_duplicates, hamming
+
+def make_hashes(count, planted=200):
+    rnd = random.Random(1)
+    hashes = {f"a{n}": rnd.getrandbits(64) for n in range(count)}
+    for n in range(planted):
+        h = hashes[f"a{n}"]
+        for bit in rnd.sample(range(64), rnd.randint(0, DUPLICATE_DISTANCE)): h ^= 1 << bit
+        hashes[f"copy{n}"] = h
+    return hashes
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--counts", type=int, nargs="+", default=[10000, 50000])
+    ap.add_argument("--queries", type=int, default=500)
+    args = ap.parse_args()
+    print(f"{'assets':>8} {'scan ms/q':>10} {'index ms/q':>11} {'groups s':>9} {'groups':>7}")
+    for count in args.counts:
+        hashes = make_hashes(count)
+        values = list(hashes.values())
+        queries = values[:args.queries]
+        index = HammingIndex()
+        for item, h in hashes.items(): index.add(h, item)
+
+        start = time.perf_counter()
+        for q in queries: [h for h in values if hamming(q, h) <= DUPLICATE_DISTANCE]
+        scan = (time.perf_counter() - start) / len(queries)
+        start = time.perf_counter()
+        for q in queries: index.search(q)
+        indexed = (time.perf_counter() - start) / len(queries)
+        start = time.perf_counter()
+        groups = group_duplicates(hashes)
+        grouping = time.perf_counter() - start
+        print(f"{count:>8} {scan * 1000:>10.2f} {indexed * 1000:>11.3f} {grouping:>9.2f} {len(groups):>7}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Project open benchmark: per-item Gio.ListStore appends vs ProjectModel.load's single splice.
+
+Both modes parse the same JSON project and fill a model that has the
+window's filter and sort models attached, as on screen. Each mode runs in
+its own subprocess so peak RSS is measured independently. Needs PyGObject
+with GTK 4.
+
+    python benchmarks/bench_load.py --count 20000
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+def make_project(path, count):
+    assets = [{"title": f"Artwork {n}", "source_path": f"/home/artist/Pictures/artwork_{n:06d}.jpg",
+               "medium": "Digital", "year": str(2000 + n % 25), "tags": ["concept", "character"][: 1 + n % 2]}
+              for n in range(count)]
+    with open(path, 'w') as o: json.dump({"metadata": {}, "assets": assets}, o)
+
+def attach_views(store):
+    # Same chain as PortfolioWindow: every items-changed runs the filter and sorter
+    from gi.repository import Gtk
+    flt = Gtk.CustomFilter.new(lambda item, *a: True)
+    sorter = Gtk.CustomSorter.new(lambda a, b, *x: 0, None)
+    sort_model = Gtk.SortListModel(model=Gtk.FilterListModel(model=store, filter=flt), sorter=sorter)
+    store.connect("items-changed", lambda s, p, r, a: s.get_n_items() == 0)
+    return sort_model
+
+def legacy(path):
+    from gi.repository import Gio
+    from src.models import AssetObject, PortfolioAsset
+    with open(path) as i: data = json.load(i)
+    store = Gio.ListStore(item_type=AssetObject)
+    views = attach_views(store)
+    for x in data["assets"]: store.append(AssetObject(PortfolioAsset.from_dict(x)))
+    return views.get_n_items()
+
+def batched(path):
+    from src.models import ProjectModel, ProjectMetadata, PortfolioAsset
+    with open(path) as i: data = json.load(i)
+    model = ProjectModel()
+    views = attach_views(model.store)
+    model.load(ProjectMetadata(), [PortfolioAsset.from_dict(x) for x in data["assets"]])
+    return views.get_n_items()
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--count", type=int, default=20000)
+    ap.add_argument("--_run", help=argparse.SUPPRESS)
+    ap.add_argument("--_file", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args._run:
+        import gi
+        gi.require_version('Gtk', '4.0')
+        start = time.perf_counter()
+        n = (legacy if args._run == "legacy" else batched)(args._file)
+        elapsed = time.perf_counter() - start
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"{elapsed:.6f} {peak_mb:.1f} {n}")
+        return
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "project.json")
+        make_project(path, args.count)
+        print(f"{'mode':>8} {'assets':>8} {'open s':>8} {'peak RSS MB':>12}")
+        for mode in ("legacy", "batched"):
+            out = subprocess.run([sys.executable, __file__, "--_run", mode, "--_file", path],
+                                 capture_output=True, text=True, check=True).stdout.split()
+            print(f"{mode:>8} {int(out[2]):>8} {float(out[0]):>8.2f} {float(out[1]):>12.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""PDF export benchmark: embedding originals (legacy) vs DPI-aware resampling.
+
+    python benchmarks/bench_pdf.py --count 12 --width 6000 --height 4000
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from PIL import Image
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+from reportlab.lib.utils import ImageReader
+from src.models import PortfolioAsset, ProjectMetadata
+from src.export import export_portfolio_pdf
+
+def make_assets(folder, count, width, height):
+    assets = []
+    for n in range(count):
+        # Every fourth image is a PNG, the last one reuses the first image
+        ext = "png" if n % 4 == 3 else "jpg"
+        path = os.path.join(folder, f"large_{n}.{ext}")
+        base = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+        noise = Image.effect_noise((width, height), 30).convert("RGB")
+        Image.blend(base, noise, 0.4).save(path, quality=92)
+        assets.append(PortfolioAsset(title=f"Piece {n}", source_path=path))
+    assets.append(PortfolioAsset(title="Reused", source_path=assets[0].source_path))
+    return assets
+
+def legacy_pdf(assets, output_filename):
+    """The exporter before DPI-aware preparation: every original embedded at full resolution."""
+    c = canvas.Canvas(output_filename, pagesize=A4)
+    width, height = A4
+    c.showPage()
+    for asset in assets:
+        img = ImageReader(asset.source_path)
+        iw, ih = img.getSize(); aspect = ih / float(iw)
+        print_w = width - 100; print_h = height * 0.55
+        draw_w = print_w; draw_h = print_w * aspect
+        if draw_h > print_h: draw_h = print_h; draw_w = draw_h / aspect
+        c.drawImage(img, (width - draw_w) / 2, height - 60 - draw_h, width=draw_w, height=draw_h, preserveAspectRatio=True)
+        c.showPage()
+    c.save()
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--count", type=int, default=12)
+    ap.add_argument("--width", type=int, default=6000)
+    ap.add_argument("--height", type=int, default=4000)
+    ap.add_argument("--dpi", type=int, default=200)
+    args = ap.parse_args()
+    with tempfile.TemporaryDirectory() as folder:
+        print(f"Generating {args.count} images at {args.width}x{args.height}...")
+        assets = make_assets(folder, args.count, args.width, args.height)
+        print(f"{'mode':>8} {'seconds':>8} {'size MB':>8}")
+        for mode in ("legacy", "dpi"):
+            out = os.path.join(folder, f"{mode}.pdf")
+            start = time.perf_counter()
+            if mode == "legacy": legacy_pdf(assets, out)
+            else: export_portfolio_pdf(assets, ProjectMetadata(), out, dpi=args.dpi)
+            elapsed = time.perf_counter() - start
+            print(f"{mode:>8} {elapsed:>8.2f} {os.path.getsize(out) / 1e6:>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,9 @@ import os
 # Ensure the current directory is in sys.path so we can import src
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from src.main import PortfolioApp
-
 if __name__ == "__main__":
+    # Imported here, not at the top: spawned thumbnail and export workers re-run this
+    # file as __mp_main__ and only need Pillow, not GTK
+    from src.main import PortfolioApp
     app = PortfolioApp()
     sys.exit(app.run(sys.argv))
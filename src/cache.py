@@ -0,0 +1,122 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from .config import CACHE_DIR
+
+INDEX_FILE = os.path.join(CACHE_DIR, "index.sqlite")
+# The 256+600 pair of a 3:2 photo is around 100 KB, so this keeps a 20k asset project's
+# thumbnails with room to spare; large renditions are the first to go when it fills up
+DEFAULT_BUDGET_MB = 2048
+# Short side of each rendition made with a thumbnail; THUMBNAIL_SIZE is the one stored as thumbnail_path
+RENDITION_SIZES = (256, 600)
+THUMBNAIL_SIZE = 600
+# Made only when an export asks for it: it alone weighs several times the other two
+LARGE_SIZE = 1600
+
+SCHEMA_VERSION = 2
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, hash TEXT);
+CREATE TABLE IF NOT EXISTS thumbs (hash TEXT PRIMARY KEY, bytes INTEGER, last_used REAL);
+CREATE INDEX IF NOT EXISTS thumbs_lru ON thumbs (last_used);
+"""
+
+def content_hash(path, chunk_size=1 << 20):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""): h.update(chunk)
+    return h.hexdigest()
+
+class ThumbnailCache:
+    """Index of generated thumbnails, stored as a single SQLite file in CACHE_DIR.
+
+    Thumbnails are keyed by a hash of the source content, so identical images at
+    different paths share one entry and an edited file gets a fresh thumbnail.
+    `sources` remembers the hash a path had at a given size/mtime, so unchanged
+    files are never re-read. Safe to use from several processes at once.
+    """
+    def __init__(self, path=INDEX_FILE, budget_mb=DEFAULT_BUDGET_MB):
+        self.path = path
+        self.budget = int(budget_mb * 1024 * 1024)
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _db(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION: self._reset()
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def _reset(self):
+        # Index from an older layout (single 600px thumbnail per hash): drop it and its files
+        db = self._conn
+        try: old = [r[0] for r in db.execute("SELECT hash FROM thumbs")]
+        except sqlite3.OperationalError: old = []
+        for digest in old:
+            try: os.remove(os.path.join(CACHE_DIR, f"{digest}.jpg"))
+            except OSError: pass
+        db.executescript(f"DROP TABLE IF EXISTS thumbs; DROP TABLE IF EXISTS sources; PRAGMA user_version={SCHEMA_VERSION};")
+
+    def path_for(self, digest, px=THUMBNAIL_SIZE):
+        return os.path.join(CACHE_DIR, f"{digest}_{px}.jpg")
+
+    def lookup(self, source_path):
+        """Returns (thumbnail_path or None, content_hash) for the current state of source_path.
+
+        A thumbnail counts only while all its RENDITION_SIZES files are on disk.
+        """
+        st = os.stat(source_path)
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT size, mtime_ns, hash FROM sources WHERE path=?", (source_path,)).fetchone()
+            if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+                digest = row[2]
+            else:
+                digest = content_hash(source_path)
+                with db: db.execute("INSERT OR REPLACE INTO sources VALUES (?,?,?,?)", (source_path, st.st_size, st.st_mtime_ns, digest))
+            with db: hit = db.execute("UPDATE thumbs SET last_used=? WHERE hash=?", (time.time(), digest)).rowcount
+            if hit and not all(os.path.exists(self.path_for(digest, px)) for px in RENDITION_SIZES):
+                # Files deleted behind the index's back (a wiped cache folder): a miss, so they are made again
+                with db: db.execute("DELETE FROM thumbs WHERE hash=?", (digest,))
+                hit = 0
+        return (self.path_for(digest) if hit else None), digest
+
+    def store(self, digest):
+        # Called once the thumbnail renditions of a hash are written, and again if a large one is added
+        paths = [self.path_for(digest, px) for px in RENDITION_SIZES + (LARGE_SIZE,)]
+        size = sum(os.path.getsize(p) for p in paths if os.path.exists(p))
+        with self._lock:
+            db = self._db()
+            with db: db.execute("INSERT OR REPLACE INTO thumbs VALUES (?,?,?)", (digest, size, time.time()))
+        self.evict()
+
+    def evict(self):
+        """Drops least recently used large renditions, then whole thumbnails, until the cache fits its disk budget."""
+        with self._lock:
+            db = self._db()
+            total = db.execute("SELECT COALESCE(SUM(bytes), 0) FROM thumbs").fetchone()[0]
+            if total <= self.budget: return
+            # Large renditions are only an export speed-up and cheap to make again; thumbnails
+            # dropped for an open project would be rebuilt as its cards scroll into view
+            shrunk = []
+            for digest, size in db.execute("SELECT hash, bytes FROM thumbs ORDER BY last_used").fetchall():
+                if total <= self.budget: break
+                large = self.path_for(digest, LARGE_SIZE)
+                try: freed = os.path.getsize(large); os.remove(large)
+                except OSError: continue
+                shrunk.append((size - freed, digest)); total -= freed
+            with db: db.executemany("UPDATE thumbs SET bytes=? WHERE hash=?", shrunk)
+            if total <= self.budget: return
+            victims = []
+            for digest, size in db.execute("SELECT hash, bytes FROM thumbs ORDER BY last_used").fetchall():
+                if total <= self.budget: break
+                victims.append(digest); total -= size
+            with db:
+                db.executemany("DELETE FROM thumbs WHERE hash=?", [(d,) for d in victims])
+                db.executemany("DELETE FROM sources WHERE hash=?", [(d,) for d in victims])
+        for digest in victims:
+            for px in RENDITION_SIZES + (LARGE_SIZE,):
+                try: os.remove(self.path_for(digest, px))
+                except OSError: pass
@@ -1,4 +1,5 @@
 import os
+import re
 
 APP_DIR = os.path.join(os.path.expanduser("~"), ".config", "portfolio_manager")
 CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "portfolio_manager_thumbs")
@@ -8,6 +9,11 @@ RECENT_PROJECTS_FILE = os.path.join(APP_DIR, "recent_projects.json")
 os.makedirs(CACHE_DIR, exist_ok=True)
 os.makedirs(TEMPLATE_DIR, exist_ok=True)
 
+# Theme syntax: {{NAME}} is HTML-escaped, {{{NAME}}} is inserted raw, {{#NAME}}...{{/NAME}}
+# repeats for every item of a list (or renders once if NAME is truthy), {{^NAME}}...{{/NAME}}
+# renders if NAME is empty. The page exposes TITLE, NAME, ROLE, BIO, EMAIL, LINKS, ITEMS and SCRIPTS.
+CARD_BLOCK = """<div class="card">{{PICTURE}}<div class="info"><h2>{{TITLE}}</h2>{{#META}}<p class="meta">{{META}}</p>{{/META}}<p class="desc">{{DESCRIPTION}}</p>{{#NOTES}}<div class="notes">{{NOTES}}</div>{{/NOTES}}{{#LINK}}<a href="{{LINK}}" class="btn" target="_blank">View Project</a>{{/LINK}}</div></div>"""
+
 THEME_DARK = """<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8"><title>{{TITLE}}</title><style>
 body{font-family:system-ui,sans-serif;background:#121212;color:#e0e0e0;padding:40px}
 header{text-align:center; margin-bottom:60px;}
@@ -18,6 +24,7 @@ h1{font-weight:300;letter-spacing:2px;margin:0 0 10px 0;}
 .card{background:#1e1e1e;border-radius:12px;overflow:hidden;box-shadow:0 4px 6px rgba(0,0,0,0.3);transition:transform 0.2s; display:flex; flex-direction:column;}
 .card:hover{transform:translateY(-5px)}
 .card img{width:100%; height: 300px; object-fit: cover; display:block; background:#000;}
+.card a.full{display:block}
 .info{padding:20px; flex-grow:1; display:flex; flex-direction:column;}
 .info h2{margin:0 0 5px 0;color:#fff;font-size:1.2rem}
 .meta{color:#bb86fc;font-size:0.85rem;font-weight:600;text-transform:uppercase;margin-bottom:10px}
@@ -33,13 +40,58 @@ footer a { color: #bb86fc; text-decoration: none; margin: 0 10px; }
     <div class="role">{{ROLE}}</div>
     <div class="bio">{{BIO}}</div>
 </header>
-<div class="grid"></div>
+<div class="grid">{{#ITEMS}}""" + CARD_BLOCK + """{{/ITEMS}}</div>
 <footer>
     <p>Contact: {{EMAIL}}</p>
     <p>{{LINKS}}</p>
 </footer>
+{{SCRIPTS}}
 </body></html>"""
 
+TAG_RE = re.compile(r"\{\{\{\s*(\w+)\s*\}\}\}|\{\{\s*([#^/]?)\s*(\w+)\s*\}\}")
+
+def compile_template(text):
+    """Parses theme text into nested nodes: ("text", s), ("var", name, escape), ("section", name, children, inverted)."""
+    root = []
+    stack = [(None, root)]
+    pos = 0
+    for m in TAG_RE.finditer(text):
+        if m.start() > pos: stack[-1][1].append(("text", text[pos:m.start()]))
+        pos = m.end()
+        raw_name, sigil, name = m.groups()
+        if raw_name: stack[-1][1].append(("var", raw_name, False))
+        elif sigil in ("#", "^"):
+            node = ("section", name, [], sigil == "^")
+            stack[-1][1].append(node)
+            stack.append((name, node[2]))
+        elif sigil == "/":
+            if stack[-1][0] != name: raise ValueError(f"Unexpected {{{{/{name}}}}} in template")
+            stack.pop()
+        else: stack[-1][1].append(("var", name, True))
+    if len(stack) > 1: raise ValueError(f"Unclosed {{{{#{stack[-1][0]}}}}} in template")
+    if pos < len(text): root.append(("text", text[pos:]))
+    return root
+
+_theme_cache = {}
+
+def load_theme(path):
+    """Compiled theme at path, re-parsed only when the file's mtime changes. Falls back to the built-in theme."""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+        cached = _theme_cache.get(path)
+        if cached and cached[0] == mtime: return cached[1]
+        with open(path, "r") as f: text = f.read()
+        # Themes written before the card block existed: render the default cards inside the grid
+        if "{{#ITEMS}}" not in text: text = text.replace('<div class="grid">', '<div class="grid">{{#ITEMS}}' + CARD_BLOCK + '{{/ITEMS}}', 1)
+        if "{{SCRIPTS}}" not in text: text = text.replace('</body>', '{{SCRIPTS}}\n</body>', 1)
+        nodes = compile_template(text)
+    except (OSError, ValueError) as e:
+        print(f"Theme {path} unusable, using default: {e}")
+        if None not in _theme_cache: _theme_cache[None] = (0, compile_template(THEME_DARK))
+        return _theme_cache[None][1]
+    _theme_cache[path] = (mtime, nodes)
+    return nodes
+
 def ensure_templates():
     if not os.path.exists(os.path.join(TEMPLATE_DIR, "Modern Dark.html")):
         with open(os.path.join(TEMPLATE_DIR, "Modern Dark.html"), "w") as f: f.write(THEME_DARK)
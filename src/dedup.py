@@ -0,0 +1,130 @@
+from itertools import combinations
+
+# Perceptual hashes are 64-bit dHashes (see utils.dhash), stored as 16 hex digits.
+# Two images this many bits apart or closer are taken for the same picture
+DUPLICATE_DISTANCE = 6
+
+def hamming(a, b): return (a ^ b).bit_count()
+
+class HammingIndex:
+    """Multi-index hashing: finds every 64-bit hash within radius bits of a query without comparing it to all of them.
+
+    Hashes are cut into CHUNKS chunks of 16 bits, each with its own table from
+    chunk value to hashes. Two hashes at most radius bits apart differ in at
+    most radius // CHUNKS bits in at least one chunk, so a query looks up its
+    own chunks and their few near variants, and only the hashes found there
+    are compared in full. A 50k asset project fills under one hash per bucket.
+    """
+    CHUNKS = 4
+
+    def __init__(self, radius=DUPLICATE_DISTANCE):
+        self.radius = radius
+        self._shifts = range(0, 64, 64 // self.CHUNKS)
+        self._mask = (1 << 64 // self.CHUNKS) - 1
+        # Every way of flipping at most radius // CHUNKS bits of a chunk
+        flips = radius // self.CHUNKS
+        self._variants = [sum(1 << b for b in bits) for n in range(flips + 1) for bits in combinations(range(64 // self.CHUNKS), n)]
+        self._tables = [{} for _ in self._shifts] # chunk value -> {hash}
+        self._items = {} # hash -> {item}
+
+    def add(self, h, item):
+        items = self._items.get(h)
+        if items is None:
+            items = self._items[h] = set()
+            for table, shift in zip(self._tables, self._shifts): table.setdefault(h >> shift & self._mask, set()).add(h)
+        items.add(item)
+
+    def discard(self, h, item):
+        items = self._items.get(h)
+        if items is None: return
+        items.discard(item)
+        if items: return
+        del self._items[h]
+        for table, shift in zip(self._tables, self._shifts):
+            bucket = table[h >> shift & self._mask]
+            bucket.discard(h)
+            if not bucket: del table[h >> shift & self._mask]
+
+    def search(self, h):
+        """[(distance, item)] for every item within radius of h."""
+        candidates = set()
+        for table, shift in zip(self._tables, self._shifts):
+            chunk = h >> shift & self._mask
+            for flip in self._variants:
+                bucket = table.get(chunk ^ flip)
+                if bucket: candidates.update(bucket)
+        found = []
+        for other in candidates:
+            d = hamming(h, other)
+            if d <= self.radius: found.extend((d, item) for item in self._items[other])
+        return found
+
+    def pairs(self):
+        """Yields every pair of distinct hashes within radius of each other, some more than once and in either order."""
+        flips = self._variants[1:]
+        for table in self._tables:
+            get = table.get
+            for chunk, bucket in table.items():
+                if len(bucket) > 1: yield from ((a, b) for a in bucket for b in bucket if a < b and hamming(a, b) <= self.radius)
+                # Each pair of neighbouring buckets is seen from both sides; taken from the lower one only
+                for other in filter(None, map(get, [chunk ^ f for f in flips if chunk ^ f > chunk])):
+                    yield from ((a, b) for a in bucket for b in other if hamming(a, b) <= self.radius)
+
+    def items(self, h): return self._items.get(h, ())
+
+class DuplicateIndex:
+    """Asset ids by perceptual hash, for finding likely duplicates. Assets without a hash are left out."""
+    def __init__(self, distance=DUPLICATE_DISTANCE):
+        self.distance = distance
+        self.clear()
+
+    def clear(self):
+        self._index = HammingIndex(self.distance)
+        self._hashes = {} # asset id -> hash
+
+    def add(self, assets):
+        for a in assets:
+            if not a.dhash: continue
+            h = self._hashes[a.id] = int(a.dhash, 16)
+            self._index.add(h, a.id)
+
+    def update(self, asset):
+        self.remove(asset.id)
+        self.add([asset])
+
+    def remove(self, asset_id):
+        h = self._hashes.pop(asset_id, None)
+        if h is not None: self._index.discard(h, asset_id)
+
+    def similar(self, asset_id):
+        """Ids of other assets within distance of asset_id's hash, closest first."""
+        h = self._hashes.get(asset_id)
+        if h is None: return []
+        return [i for _, i in sorted(self._index.search(h)) if i != asset_id]
+
+    def snapshot(self):
+        """{asset id: hash} for group_duplicates(), safe to hand to another thread."""
+        return dict(self._hashes)
+
+def group_duplicates(hashes, distance=DUPLICATE_DISTANCE):
+    """Lists of two or more ids from hashes ({id: hash}) that are likely the same picture, largest first.
+
+    Near-duplicates are chained, so a group can hold two images further apart
+    than distance if a third lies between them. Slow enough at tens of
+    thousands of assets to belong off the main thread.
+    """
+    index = HammingIndex(distance)
+    for item, h in hashes.items(): index.add(h, item)
+    # Union-find over distinct hashes; ids sharing a hash are together already
+    parent = {}
+    def root(h):
+        while parent.get(h, h) != h:
+            parent[h] = parent.get(parent[h], parent[h]) # Path halving: skip to the grandparent
+            h = parent[h]
+        return h
+    for a, b in index.pairs():
+        ra, rb = root(a), root(b)
+        if ra != rb: parent[ra] = rb
+    groups = {}
+    for h in set(hashes.values()): groups.setdefault(root(h), []).extend(index.items(h))
+    return sorted((g for g in groups.values() if len(g) > 1), key=len, reverse=True)
@@ -1,65 +1,381 @@
 import os
+import math
+import shutil
+import tempfile
+import html
+import json
+import hashlib
+import multiprocessing
+from collections import ChainMap, Counter, deque
+from concurrent.futures import ProcessPoolExecutor, BrokenExecutor, wait, FIRST_COMPLETED
 from PIL import Image
-from .config import THEME_DARK
+from .config import load_theme
+from .utils import decode_to_size, source_for_size
+from .cache import content_hash
 try:
     from reportlab.lib.pagesizes import A4
     from reportlab.pdfgen import canvas
-    from reportlab.lib.utils import ImageReader
     HAS_REPORTLAB = True
 except ImportError:
     HAS_REPORTLAB = False
 
-def export_portfolio_html(assets, meta, output_dir, template_path):
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 2
+# format key -> (Pillow format, extension, MIME type), best compression first
+WEB_FORMATS = {
+    "avif": ("AVIF", "avif", "image/avif"),
+    "webp": ("WEBP", "webp", "image/webp"),
+    "jpeg": ("JPEG", "jpg", "image/jpeg"),
+}
+# Cards are ~350-480px wide; 960 covers them on HiDPI screens
+CARD_WIDTHS = [480, 960]
+CARD_SIZES = "(max-width: 800px) 100vw, 480px"
+
+def web_image_params():
+    """Everything that changes the rendered images; a different value re-renders every asset."""
+    Image.init()
+    formats = [k for k, (fmt, _, _) in WEB_FORMATS.items() if fmt in Image.SAVE]
+    return {"max_px": 1920, "widths": CARD_WIDTHS, "formats": formats, "quality": {"avif": 60, "webp": 80, "jpeg": 85}}
+
+def _load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILE), 'r') as f: manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION: return manifest
+    except (OSError, ValueError): pass
+    return {"version": MANIFEST_VERSION, "assets": {}, "page": None}
+
+def _save_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    with open(path + ".part", 'w') as f: json.dump(manifest, f, separators=(",", ":"))
+    os.replace(path + ".part", path)
+
+def _source_state(asset, entry):
+    """Content hash plus stat of the source; the file is only re-hashed when its size or mtime moved."""
+    st = os.stat(asset.source_path)
+    if entry and entry.get("size") == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns:
+        digest = entry["source"]
+    else:
+        digest = content_hash(asset.source_path)
+    return {"source": digest, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+def _entry_files(entry):
+    outputs = entry.get("outputs") or {}
+    files = [outputs["full"]] if "full" in outputs else []
+    for _, by_format in outputs.get("srcset", []): files.extend(by_format.values())
+    return files
+
+def _save_web_image(img, output_dir, rel_path, fmt, params):
+    # Written under a temporary name so an interrupted export never leaves a half-written image
+    path = os.path.join(output_dir, rel_path)
+    img.save(path + ".part", WEB_FORMATS[fmt][0], quality=params["quality"][fmt])
+    os.replace(path + ".part", path)
+
+def _render_web_image(source_path, asset_id, output_dir, params):
+    """Process pool job: one decode, then the full-size JPEG plus each card width in each format."""
+    written = []
+    try:
+        img = decode_to_size(source_for_size(source_path, params["max_px"]), params["max_px"])
+        full = f"images/{asset_id}.jpg"
+        _save_web_image(img, output_dir, full, "jpeg", params); written.append(full)
+        srcset = []
+        # Widest first so every step resizes from the previous, already smaller, image
+        for width in sorted(params["widths"], reverse=True):
+            if width < img.width: img = img.resize((width, max(1, round(img.height * width / img.width))), Image.LANCZOS, reducing_gap=2.0)
+            if srcset and srcset[-1][0] == img.width: continue # Source narrower than this width
+            by_format = {}
+            for fmt in params["formats"]:
+                rel_path = f"images/{asset_id}-{img.width}.{WEB_FORMATS[fmt][1]}"
+                _save_web_image(img, output_dir, rel_path, fmt, params); written.append(rel_path)
+                by_format[fmt] = rel_path
+            srcset.append([img.width, by_format])
+        return {"full": full, "srcset": srcset[::-1]}
+    except Exception:
+        for rel_path in written:
+            try: os.remove(os.path.join(output_dir, rel_path))
+            except OSError: pass
+        return None
+
+def _picture_html(outputs, alt):
+    """<picture> with modern-format sources and a JPEG fallback; the full-size image is only fetched on click."""
+    srcset = outputs["srcset"]
+    sources = []
+    for fmt in ("avif", "webp"):
+        candidates = [f"{by_format[fmt]} {w}w" for w, by_format in srcset if fmt in by_format]
+        if candidates: sources.append(f'<source type="{WEB_FORMATS[fmt][2]}" srcset="{", ".join(candidates)}" sizes="{CARD_SIZES}">')
+    jpegs = ", ".join(f"{by_format['jpeg']} {w}w" for w, by_format in srcset)
+    img = f'<img src="{srcset[0][1]["jpeg"]}" srcset="{jpegs}" sizes="{CARD_SIZES}" alt="{html.escape(alt)}" loading="lazy" decoding="async">'
+    return f'<a href="{outputs["full"]}" class="full"><picture>{"".join(sources)}{img}</picture></a>'
+
+def _remove_partial_files(folder):
+    for name in os.listdir(folder):
+        if name.endswith(".part"):
+            try: os.remove(os.path.join(folder, name))
+            except OSError: pass
+
+class Markup(str):
+    """Already-safe HTML; inserted as-is even by escaping {{NAME}} tags."""
+
+def render_template(nodes, context, write):
+    """Streams compiled theme nodes through write(); context is a dict, or a ChainMap inside sections."""
+    for node in nodes:
+        kind = node[0]
+        if kind == "text": write(node[1])
+        elif kind == "var":
+            value = context.get(node[1])
+            if value is None: continue
+            value = value if isinstance(value, str) else str(value)
+            write(html.escape(value) if node[2] and not isinstance(value, Markup) else value)
+        else:
+            _, name, children, inverted = node
+            value = context.get(name)
+            if inverted:
+                if not value: render_template(children, context, write)
+            elif isinstance(value, dict): render_template(children, ChainMap(value, context), write)
+            elif value is not None and not isinstance(value, str) and hasattr(value, "__iter__"):
+                for item in value: render_template(children, ChainMap(item, context), write)
+            elif value: render_template(children, context, write)
+
+def _find_section(nodes, name):
+    for node in nodes:
+        if node[0] == "section":
+            if node[1] == name: return node[2]
+            found = _find_section(node[2], name)
+            if found is not None: return found
+    return None
+
+def _write_if_changed(path, produce, old_hash):
+    """Streams produce(write) into a temp file while hashing it; the file at path is only replaced if the hash changed."""
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(path + ".part", "w") as f:
+        def write(chunk): hasher.update(chunk.encode('utf-8')); f.write(chunk)
+        produce(write)
+    digest = hasher.hexdigest()
+    if digest != old_hash or not os.path.exists(path): os.replace(path + ".part", path)
+    else: os.remove(path + ".part")
+    return digest
+
+# Loaded as <script> rather than fetched as JSON so paged exports also work from file://
+LAZY_LOAD_SCRIPT = """<script>(function(){
+var grid=document.querySelector('.grid'),total=__TOTAL__,next=1,busy=false,sentinel=document.createElement('div');
+grid.parentNode.insertBefore(sentinel,grid.nextSibling);
+var io=new IntersectionObserver(function(e){
+if(!e[0].isIntersecting||busy||next>total)return;
+busy=true;var s=document.createElement('script');s.src='data/cards-'+next+'.js';document.body.appendChild(s);
+},{rootMargin:'1200px'});
+window.curatorCards=function(n,cards){
+grid.insertAdjacentHTML('beforeend',cards.join(''));next=n+1;busy=false;
+io.unobserve(sentinel);if(next<=total)io.observe(sentinel);
+};
+io.observe(sentinel);
+})();</script>"""
+
+def _links_html(meta):
+    links = []
+    if meta.social_link: links.append(f'<a href="{html.escape(meta.social_link)}">Social</a>')
+    if meta.cv_link: links.append(f'<a href="{html.escape(meta.cv_link)}">Resume/CV</a>')
+    return Markup(" | ".join(links))
+
+def _card_context(asset, outputs):
+    return {
+        "ID": asset.id, "TITLE": asset.title, "DESCRIPTION": asset.description,
+        "MEDIUM": asset.medium, "YEAR": asset.year, "LINK": asset.link, "NOTES": asset.notes,
+        "META": " | ".join(x for x in (asset.medium, asset.year) if x),
+        "PICTURE": Markup(_picture_html(outputs, asset.title)),
+    }
+
+def export_portfolio_html(assets, meta, output_dir, template_path, progress=None, cancel_event=None, max_workers=None, page_size=0):
+    """Renders the website into output_dir. Images are encoded on a process pool.
+
+    output_dir/manifest.json records the source hash, render parameters and output
+    of every exported asset, so a re-export only renders what changed, deletes
+    images of removed assets and leaves index.html alone if the page is identical.
+
+    With page_size > 0 only the first page_size cards are in index.html; the rest
+    are split into data/cards-N.js shards that a small script loads on scroll.
+
+    progress(done, total) is called from the calling thread after every asset.
+    Returns None if cancel_event was set before the export finished, else the
+    number of images that could not be rendered and whose cards were left out.
+    A crashed worker raises BrokenExecutor rather than publish a page missing
+    every card still queued; what was rendered is kept for the next export.
+    """
     images_dir = os.path.join(output_dir, "images")
     os.makedirs(images_dir, exist_ok=True)
-    html_items = []
+    manifest = _load_manifest(output_dir)
+    entries = manifest["assets"]
+    params = web_image_params()
     
+    assets = [a for a in assets if os.path.exists(a.source_path)]
+    total = len(assets)
+
+    # Orphans: images of assets that are no longer part of the project
+    live = {a.id for a in assets}
+    for asset_id in [k for k in entries if k not in live]:
+        for rel_path in _entry_files(entries.pop(asset_id)):
+            try: os.remove(os.path.join(output_dir, rel_path))
+            except OSError: pass
+
+    ready = set()
+    jobs = {}
+    states = {}
+    failed = 0
     for asset in assets:
-        if not os.path.exists(asset.source_path): continue
-        safe_name = f"{asset.id}.jpg"
-        dest_path = os.path.join(images_dir, safe_name)
-        
-        # Optimization: Skip if destination exists and is newer than source
-        should_process = True
-        if os.path.exists(dest_path):
-            try:
-                if os.path.getmtime(asset.source_path) <= os.path.getmtime(dest_path):
-                    should_process = False
-            except:
-                pass # If error checking times, re-process to be safe
-        
-        if should_process:
-            try:
-                with Image.open(asset.source_path) as img:
-                    if img.mode in ("RGBA", "P"): img = img.convert("RGB")
-                    img.thumbnail((1920, 1920)); img.save(dest_path, "JPEG", quality=85)
-            except: continue
-        
-        m_txt = f'<p class="meta">{asset.medium} {f"| {asset.year}" if asset.year else ""}</p>' if (asset.year or asset.medium) else ""
-        link = f'<a href="{asset.link}" class="btn" target="_blank">View Project</a>' if asset.link else ""
-        notes = f'<div class="notes">{asset.notes}</div>' if asset.notes else ""
-        html_items.append(f"""<div class="card"><img src="images/{safe_name}" loading="lazy"><div class="info"><h2>{asset.title}</h2>{m_txt}<p class="desc">{asset.description}</p>{notes}{link}</div></div>""")
+        entry = entries.get(asset.id)
+        try: states[asset.id] = _source_state(asset, entry)
+        except OSError: failed += 1; continue
+        if (entry and entry["source"] == states[asset.id]["source"] and entry.get("params") == params
+                and os.path.exists(os.path.join(output_dir, entry["outputs"]["full"]))):
+            entry.update(states[asset.id]); ready.add(asset.id); continue
+        jobs[asset.id] = (asset.source_path, asset.id, output_dir, params)
+
+    def record(asset_id, outputs):
+        ready.add(asset_id)
+        new_entry = dict(states[asset_id], params=params, outputs=outputs)
+        # Widths that a previous render produced but this one did not
+        for rel_path in set(_entry_files(entries.get(asset_id, {}))) - set(_entry_files(new_entry)):
+            try: os.remove(os.path.join(output_dir, rel_path))
+            except OSError: pass
+        entries[asset_id] = new_entry
+
+    done = len(ready)
+    if progress: progress(done, total)
+    if jobs:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx) as pool:
+            pending = {pool.submit(_render_web_image, *args): asset_id for asset_id, args in jobs.items()}
+            while pending:
+                if cancel_event and cancel_event.is_set():
+                    # Drop queued jobs; the ones already running finish their atomic write
+                    pool.shutdown(wait=True, cancel_futures=True)
+                    for fut, asset_id in pending.items():
+                        if not fut.cancelled() and fut.exception() is None and fut.result(): record(asset_id, fut.result())
+                    _remove_partial_files(images_dir)
+                    _save_manifest(output_dir, manifest)
+                    return None
+                finished, _ = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    asset_id = pending.pop(fut)
+                    try: outputs = fut.result()
+                    except BrokenExecutor:
+                        # Every job still pending fails the same way: stop, keeping what was rendered
+                        _remove_partial_files(images_dir)
+                        _save_manifest(output_dir, manifest)
+                        raise
+                    except Exception: outputs = None
+                    if outputs: record(asset_id, outputs)
+                    else: failed += 1
+                    done += 1
+                    if progress: progress(done, total)
+
+    context = {
+        "TITLE": meta.portfolio_title, "NAME": meta.artist_name, "ROLE": meta.role,
+        "BIO": meta.bio, "EMAIL": meta.email, "LINKS": _links_html(meta), "SCRIPTS": "",
+    }
+    theme = load_theme(template_path)
+    cards = [_card_context(a, entries[a.id]["outputs"]) for a in assets if a.id in ready]
+    # Paged mode: index.html holds the first page, the rest is streamed in from data/cards-N.js
+    shards = [cards[i:i + page_size] for i in range(page_size, len(cards), page_size)] if page_size else []
+    if shards:
+        cards = cards[:page_size]
+        context["SCRIPTS"] = Markup(LAZY_LOAD_SCRIPT.replace("__TOTAL__", str(len(shards))))
+    card_nodes = _find_section(theme, "ITEMS") or []
+    data_dir = os.path.join(output_dir, "data")
+    if shards: os.makedirs(data_dir, exist_ok=True)
+    old_shards = manifest.get("shards") or []
+    new_shards = []
+    for n, shard in enumerate(shards, 1):
+        def produce(write, n=n, shard=shard):
+            write(f"curatorCards({n},[")
+            for i, card in enumerate(shard):
+                chunks = []
+                render_template(card_nodes, ChainMap(card, context), chunks.append)
+                write(("," if i else "") + json.dumps("".join(chunks)))
+            write("]);\n")
+        new_shards.append(_write_if_changed(os.path.join(data_dir, f"cards-{n}.js"), produce, old_shards[n - 1] if n <= len(old_shards) else None))
+    for n in range(len(shards) + 1, len(old_shards) + 1):
+        try: os.remove(os.path.join(data_dir, f"cards-{n}.js"))
+        except OSError: pass
+    manifest["shards"] = new_shards
+
+    context["ITEMS"] = cards
+    manifest["page"] = _write_if_changed(os.path.join(output_dir, "index.html"), lambda write: render_template(theme, context, write), manifest.get("page"))
+    _save_manifest(output_dir, manifest)
+    return failed
 
+PDF_DPI = 200
+EXIF_ORIENTATION = 0x0112
+# Same mapping as ImageOps.exif_transpose, applied after resampling instead of to the full image
+EXIF_TRANSPOSE = {
+    2: Image.FLIP_LEFT_RIGHT, 3: Image.ROTATE_180, 4: Image.FLIP_TOP_BOTTOM,
+    5: Image.TRANSPOSE, 6: Image.ROTATE_270, 7: Image.TRANSVERSE, 8: Image.ROTATE_90,
+}
+# A JPEG at most this much larger than needed is embedded as-is: re-encoding would cost more than it saves
+PDF_PASSTHROUGH_SLACK = 1.5
+
+def _prepare_pdf_image(source_path, box_w, box_h, dpi, work_dir):
+    """Fits an image into a box_w x box_h point box and returns (draw_w, draw_h, image_path).
+
+    image_path is source_path itself for JPEGs already close to dpi at that size,
+    which ReportLab embeds without re-encoding; anything else is oriented,
+    resampled to dpi and written as a JPEG into work_dir.
+    """
+    with Image.open(source_path) as img:
+        (iw, ih), fmt, mode = img.size, img.format, img.mode
+        orientation = img.getexif().get(EXIF_ORIENTATION, 1)
+    if orientation in (5, 6, 7, 8): iw, ih = ih, iw # Rotated a quarter turn
+    aspect = ih / float(iw)
+    draw_w = box_w; draw_h = box_w * aspect
+    if draw_h > box_h: draw_h = box_h; draw_w = draw_h / aspect
+    need_w = math.ceil(draw_w / 72 * dpi); need_h = math.ceil(draw_h / 72 * dpi)
+    if fmt == "JPEG" and mode in ("RGB", "L") and orientation == 1 and iw <= need_w * PDF_PASSTHROUGH_SLACK:
+        return draw_w, draw_h, source_path
+    max_px = max(need_w, need_h)
+    # Handing ReportLab a file rather than bytes keeps the writer from decoding it again just to hash it
+    out = os.path.join(work_dir, hashlib.blake2b(source_path.encode('utf-8'), digest_size=16).hexdigest() + ".jpg")
+    # Always the original: cached renditions are q85 JPEGs for the screen, and print output
+    # resampled from one would go through lossy compression twice
+    with decode_to_size(source_path, max_px) as small:
+        if orientation in EXIF_TRANSPOSE: small = small.transpose(EXIF_TRANSPOSE[orientation])
+        small.save(out, "JPEG", quality=90)
+    return draw_w, draw_h, out
+
+def _iter_pdf_images(assets, box_w, box_h, dpi, work_dir, max_workers=None):
+    """Yields (asset, (draw_w, draw_h, image_path) or None, last_use) in asset order.
+
+    Images are prepared on a process pool at most a small window ahead of the
+    consumer, so memory stays flat however long the document is. Each distinct
+    source is prepared once; last_use tells when its prepared file can go.
+    """
+    max_workers = max_workers or os.cpu_count() or 2
+    window = max_workers * 2
+    uses = Counter(a.source_path for a in assets)
+    upcoming = deque(dict.fromkeys(a.source_path for a in assets)) # Distinct paths, first-use order
+    futures = {}
+    pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
     try:
-        with open(template_path, "r") as f: content = f.read()
-    except: content = THEME_DARK
-    
-    # Inject Metadata
-    content = content.replace("{{TITLE}}", meta.portfolio_title)
-    content = content.replace("{{NAME}}", meta.artist_name)
-    content = content.replace("{{ROLE}}", meta.role)
-    content = content.replace("{{BIO}}", meta.bio)
-    content = content.replace("{{EMAIL}}", meta.email)
-    
-    links = []
-    if meta.social_link: links.append(f'<a href="{meta.social_link}">Social</a>')
-    if meta.cv_link: links.append(f'<a href="{meta.cv_link}">Resume/CV</a>')
-    content = content.replace("{{LINKS}}", " | ".join(links))
-    
-    content = content.replace("", "".join(html_items))
-    with open(os.path.join(output_dir, "index.html"), "w") as f: f.write(content)
+        for asset in assets:
+            # Paths are submitted in first-use order, so this asset's path is next in line at the latest
+            while upcoming and (asset.source_path not in futures or len(futures) < window):
+                path = upcoming.popleft()
+                futures[path] = pool.submit(_prepare_pdf_image, path, box_w, box_h, dpi, work_dir)
+            fut = futures[asset.source_path]
+            uses[asset.source_path] -= 1
+            last_use = not uses[asset.source_path]
+            if last_use: del futures[asset.source_path]
+            try: prepared = fut.result()
+            except BrokenExecutor: raise # A crashed worker fails every page still to come, not just this one
+            except Exception: prepared = None
+            yield asset, prepared, last_use
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def export_portfolio_pdf(assets, meta, output_filename, dpi=PDF_DPI, progress=None, cancel_event=None, max_workers=None):
+    """Writes the PDF portfolio. Page images are prepared in parallel while this thread writes the canvas.
 
-def export_portfolio_pdf(assets, meta, output_filename):
+    progress(done, total) is called after every page. Returns False if cancel_event
+    was set before the document was saved; nothing is written in that case, nor
+    when a crashed worker raises BrokenExecutor.
+    """
     if not HAS_REPORTLAB: return False
     
     c = canvas.Canvas(output_filename, pagesize=A4)
@@ -89,30 +405,41 @@ def export_portfolio_pdf(assets, meta, output_filename):
     c.showPage()
     
     # --- Assets ---
-    for asset in assets:
-        if not os.path.exists(asset.source_path): continue
-        try:
-            img = ImageReader(asset.source_path)
-            iw, ih = img.getSize(); aspect = ih / float(iw)
-            print_w = width - 100; print_h = height * 0.55
-            draw_w = print_w; draw_h = print_w * aspect
-            if draw_h > print_h: draw_h = print_h; draw_w = draw_h / aspect
-            
-            x_pos = (width - draw_w) / 2
-            y_pos = height - 60 - draw_h
-            
-            c.drawImage(img, x_pos, y_pos, width=draw_w, height=draw_h, preserveAspectRatio=True)
-            
-            text_y = y_pos - 40
-            c.setFont("Helvetica-Bold", 18); c.drawString(50, text_y, asset.title); text_y -= 25
-            
-            meta_txt = f"{asset.medium}"
-            if asset.year: meta_txt += f" | {asset.year}"
-            c.setFont("Helvetica-Oblique", 12); c.setFillColorRGB(0.4, 0.4, 0.4)
-            c.drawString(50, text_y, meta_txt); text_y -= 30
-            
-            c.setFont("Helvetica", 12); c.setFillColorRGB(0, 0, 0)
-            c.drawString(50, text_y, asset.description[:100] + "..." if len(asset.description)>100 else asset.description)
-            c.showPage()
-        except: pass
-    c.save()
+    print_w = width - 100; print_h = height * 0.55
+    assets = [a for a in assets if os.path.exists(a.source_path)]
+    work_dir = tempfile.mkdtemp(prefix="curator-pdf-")
+    images = _iter_pdf_images(assets, print_w, print_h, dpi, work_dir, max_workers)
+    try:
+        for done, (asset, prepared, last_use) in enumerate(images, 1):
+            if cancel_event and cancel_event.is_set(): return False
+            if progress: progress(done, len(assets))
+            if prepared is None: continue
+            _draw_pdf_page(c, asset, *prepared)
+            # ReportLab has read the file by now; the same path again is embedded once by name
+            if last_use and prepared[2] != asset.source_path: os.remove(prepared[2])
+        c.save()
+    finally:
+        images.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return True
+
+def _draw_pdf_page(c, asset, draw_w, draw_h, image_path):
+    width, height = A4
+    try:
+        x_pos = (width - draw_w) / 2
+        y_pos = height - 60 - draw_h
+        
+        c.drawImage(image_path, x_pos, y_pos, width=draw_w, height=draw_h, preserveAspectRatio=True)
+        
+        text_y = y_pos - 40
+        c.setFont("Helvetica-Bold", 18); c.drawString(50, text_y, asset.title); text_y -= 25
+        
+        meta_txt = f"{asset.medium}"
+        if asset.year: meta_txt += f" | {asset.year}"
+        c.setFont("Helvetica-Oblique", 12); c.setFillColorRGB(0.4, 0.4, 0.4)
+        c.drawString(50, text_y, meta_txt); text_y -= 30
+        
+        c.setFont("Helvetica", 12); c.setFillColorRGB(0, 0, 0)
+        c.drawString(50, text_y, asset.description[:100] + "..." if len(asset.description)>100 else asset.description)
+        c.showPage()
+    except Exception as e: print(f"PDF page for {asset.source_path} failed: {e}")
@@ -1,9 +1,19 @@
+import re
+import sys
 import uuid
-from dataclasses import dataclass, field
+import locale
+import weakref
+from bisect import bisect_left
+from itertools import count
+from collections import deque
+from operator import attrgetter
+from dataclasses import dataclass, field, fields, replace
 from typing import Optional
 import gi
 gi.require_version('Gtk', '4.0')
 from gi.repository import GObject, Gio
+from .search import SearchIndex
+from .dedup import DuplicateIndex
 
 @dataclass
 class ProjectMetadata:
@@ -19,8 +29,10 @@ class ProjectMetadata:
     @classmethod
     def from_dict(cls, data): return cls(**data)
 
-@dataclass
+@dataclass(slots=True)
 class PortfolioAsset:
+    # Slotted, with tags and medium interned: a project repeats the same few of each thousands of times.
+    # tags is only ever replaced, never edited in place, so values() tuples can share it with the asset
     id: str = field(default_factory=lambda: str(uuid.uuid4()))
     title: str = "Untitled"
     source_path: str = ""
@@ -31,9 +43,26 @@ class PortfolioAsset:
     link: str = ""
     notes: str = "" 
     tags: list[str] = field(default_factory=list)
-    def to_dict(self): return {k: v for k, v in self.__dict__.items()}
+    dhash: str = "" # Perceptual hash from thumbnailing, see utils.dhash
+    # Source file not found on disk. Only known while the project is open, so never saved
+    missing: bool = field(default=False, metadata={"saved": False})
+    def __post_init__(self):
+        self.medium = sys.intern(self.medium)
+        self.tags = [sys.intern(t) for t in self.tags]
+    def values(self): return _asset_values(self)
+    def to_dict(self): return dict(zip(ASSET_FIELDS, _asset_values(self)))
     @classmethod
     def from_dict(cls, data): return cls(**data)
+    @classmethod
+    def from_values(cls, values): return cls(**dict(zip(ASSET_FIELDS, values)))
+
+ASSET_FIELDS = tuple(f.name for f in fields(PortfolioAsset) if f.metadata.get("saved", True))
+_asset_values = attrgetter(*ASSET_FIELDS) # Field values as a tuple, in ASSET_FIELDS order
+
+# AssetObject properties the search index covers
+SEARCHED_PROPERTIES = {"title", "tags-string", "medium", "year", "description"}
+# AssetObject properties that are not part of the project, so changing them is no edit
+UNSAVED_PROPERTIES = {"missing"}
 
 class AssetObject(GObject.Object):
     __gtype_name__ = 'AssetObject'
@@ -52,10 +81,12 @@ class AssetObject(GObject.Object):
     def description(self, v): self._asset.description = v; self.notify("description")
     @GObject.Property(type=str)
     def thumbnail_path(self): return self._asset.thumbnail_path or ""
+    @thumbnail_path.setter
+    def thumbnail_path(self, v): self._asset.thumbnail_path = v or None; self.notify("thumbnail-path")
     @GObject.Property(type=str)
     def medium(self): return self._asset.medium
     @medium.setter
-    def medium(self, v): self._asset.medium = v; self.notify("medium")
+    def medium(self, v): self._asset.medium = sys.intern(v); self.notify("medium")
     @GObject.Property(type=str)
     def year(self): return self._asset.year
     @year.setter
@@ -72,32 +103,336 @@ class AssetObject(GObject.Object):
     def tags_string(self): return ", ".join(self._asset.tags)
     @tags_string.setter
     def tags_string(self, v): 
-        self._asset.tags = [t.strip() for t in v.split(",") if t.strip()]
+        self._asset.tags = [sys.intern(t.strip()) for t in v.split(",") if t.strip()]
         self.notify("tags-string")
+    @GObject.Property(type=str)
+    def dhash(self): return self._asset.dhash
+    @dhash.setter
+    def dhash(self, v): self._asset.dhash = v; self.notify("dhash")
+    @GObject.Property(type=bool, default=False)
+    def missing(self): return self._asset.missing
+    @missing.setter
+    def missing(self, v): self._asset.missing = v; self.notify("missing")
     def get_asset(self): return self._asset
 
+class AssetListModel(GObject.Object, Gio.ListModel):
+    """Gio.ListModel over a plain list of PortfolioAsset.
+
+    AssetObject wrappers are only built when the grid, filter or sorter asks for
+    an item. They live in a weak cache, plus a small ring of recently used ones
+    so a sort or filter pass does not rebuild them on every call; whatever GTK
+    still holds stays the same object.
+    """
+    __gtype_name__ = 'AssetListModel'
+    RECENT_WRAPPERS = 512
+
+    def __init__(self, on_wrap=None):
+        super().__init__()
+        self._assets = []
+        self._objects = weakref.WeakValueDictionary() # id(asset) -> AssetObject; a live wrapper keeps its asset alive
+        self._recent = deque(maxlen=self.RECENT_WRAPPERS)
+        self.on_wrap = on_wrap # Called with each new wrapper
+        self._by_id = {} # asset.id -> asset
+        # id(asset) -> position, trusted below _valid; rebuilt lazily from there, so appends stay cheap
+        self._positions = {}
+        self._valid = 0
+        self.removed = [] # Assets the splice being announced took out, for items-changed handlers
+
+    def do_get_item_type(self): return AssetObject.__gtype__
+    def do_get_n_items(self): return len(self._assets)
+    def do_get_item(self, position):
+        if position >= len(self._assets): return None
+        return self.wrap(self._assets[position])
+
+    def wrap(self, asset):
+        obj = self._objects.get(id(asset))
+        if obj is None:
+            obj = self._objects[id(asset)] = AssetObject(asset)
+            if self.on_wrap: self.on_wrap(obj)
+        self._recent.append(obj)
+        return obj
+
+    def splice(self, position, n_removals, assets):
+        if not n_removals and not assets: return
+        self.removed = self._assets[position:position + n_removals]
+        for a in self.removed:
+            self._by_id.pop(a.id, None); self._positions.pop(id(a), None)
+        self._assets[position:position + n_removals] = assets
+        for a in assets: self._by_id[a.id] = a
+        self._valid = min(self._valid, position)
+        self.items_changed(position, n_removals, len(assets))
+        self.removed = []
+    def append(self, asset): self.splice(len(self._assets), 0, [asset])
+    def insert(self, position, asset): self.splice(position, 0, [asset])
+    def adopt(self, obj):
+        # Re-inserting a removed wrapper (undo) keeps it as the item for its asset
+        self._objects[id(obj.get_asset())] = obj
+    def insert_object(self, position, obj):
+        self.adopt(obj)
+        self.insert(position, obj.get_asset())
+    def remove(self, position): self.splice(position, 1, [])
+    def remove_all(self): self.splice(0, len(self._assets), [])
+
+    def get_asset(self, position): return self._assets[position]
+    def assets(self): return list(self._assets)
+    def find_id(self, asset_id): return self._by_id.get(asset_id)
+    def index(self, asset):
+        """Position of asset (by identity), or -1."""
+        pos = self._positions.get(id(asset))
+        if pos is None or pos >= self._valid:
+            for i in range(self._valid, len(self._assets)): self._positions[id(self._assets[i])] = i
+            self._valid = len(self._assets)
+            pos = self._positions.get(id(asset))
+        return pos if pos is not None and self._assets[pos] is asset else -1
+
+SORT_MANUAL, SORT_TITLE, SORT_YEAR = range(3) # Same order as the window's sort dropdown
+YEAR_RE = re.compile(r"-?\d+")
+
+def collation_key(text):
+    # Locale-aware (GTK has called setlocale), case-insensitive
+    try: return locale.strxfrm(text.casefold())
+    except (ValueError, OSError): return text.casefold()
+
+def year_key(year):
+    m = YEAR_RE.search(year)
+    return int(m.group()) if m else 0
+
+class SortedAssetView(GObject.Object, Gio.ListModel):
+    """The project store in the order the grid shows it.
+
+    In SORT_MANUAL it passes items and changes straight through. Otherwise it
+    holds a permutation made with sorted() over cached per-asset keys (see
+    ProjectModel.sort_key), so a resort costs one C-level sort rather than a
+    Python comparison callback per pair. Keys end in the insertion sequence and
+    so never tie: added, removed and edited assets are placed with bisect and
+    announced as changes at their own positions, which keeps the selection and
+    spares the filter a pass over the whole project.
+    """
+    __gtype_name__ = 'SortedAssetView'
+    # Changes larger than this (opening a project) resort and reset instead, cheaper than that many inserts
+    RESORT_ABOVE = 2000
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+        self.mode = SORT_MANUAL
+        self._order = None # Sorted assets, None in SORT_MANUAL
+        self._keys = [] # Key of each asset in _order, as used to sort it
+        self._key_of = {} # asset id -> its entry in _keys
+        model.store.connect("items-changed", self._on_store_changed)
+        model.on_sort_key_changed = self._on_key_changed
+
+    def do_get_item_type(self): return AssetObject.__gtype__
+    def do_get_n_items(self):
+        # Sorted changes are announced in steps, so the count follows _order rather than the store
+        return self.model.store.get_n_items() if self._order is None else len(self._order)
+    def do_get_item(self, position):
+        if self._order is None: return self.model.store.get_item(position)
+        return self.model.store.wrap(self._order[position]) if position < len(self._order) else None
+
+    def set_mode(self, mode):
+        if mode == self.mode: return
+        self.mode = mode
+        n = self.model.store.get_n_items()
+        self._resort()
+        self.items_changed(0, n, n)
+
+    def _key(self, asset):
+        # (title, sequence) or (year, sequence): ties keep the order assets were added in
+        key = self.model.sort_key(asset)
+        return key[0::2] if self.mode == SORT_TITLE else key[1:]
+
+    def _resort(self):
+        if self.mode == SORT_MANUAL: self._order = None; self._keys = []; self._key_of = {}; return
+        keyed = sorted((self._key(a), a) for a in self.model.store.assets())
+        self._keys = [k for k, _ in keyed]
+        self._order = [a for _, a in keyed]
+        self._key_of = {a.id: k for k, a in keyed}
+
+    def _on_store_changed(self, store, position, removed, added):
+        if self._order is None: self.items_changed(position, removed, added); return
+        if removed + added > self.RESORT_ABOVE:
+            old = len(self._order)
+            self._resort()
+            self.items_changed(0, old, len(self._order))
+            return
+        # Removed runs back to front, so the positions still to announce stay valid
+        gone = sorted(bisect_left(self._keys, self._key_of.pop(a.id)) for a in store.removed)
+        for start, run in reversed(_runs((p, None) for p in gone)):
+            del self._order[start:start + len(run)]; del self._keys[start:start + len(run)]
+            self.items_changed(start, len(run), 0)
+        # New assets in key order, so each lands after those already announced
+        new = sorted((self._key(store.get_asset(i)), store.get_asset(i)) for i in range(position, position + added))
+        run_start = run_len = 0
+        for key, asset in new:
+            self._key_of[asset.id] = key
+            pos = bisect_left(self._keys, key)
+            if run_len and pos != run_start + run_len: self.items_changed(run_start, 0, run_len); run_len = 0
+            if not run_len: run_start = pos
+            self._keys.insert(pos, key); self._order.insert(pos, asset)
+            run_len += 1
+        if run_len: self.items_changed(run_start, 0, run_len)
+
+    def _on_key_changed(self, asset):
+        # A title or year edit: the asset moves to where its new key belongs, if anywhere
+        if self._order is None or asset.id not in self._key_of: return
+        pos = bisect_left(self._keys, self._key_of[asset.id])
+        key = self._key_of[asset.id] = self._key(asset)
+        new = bisect_left(self._keys, key)
+        if new in (pos, pos + 1): self._keys[pos] = key; return # Still between the same neighbours
+        del self._keys[pos]; del self._order[pos]
+        self.items_changed(pos, 1, 0)
+        new = bisect_left(self._keys, key)
+        self._keys.insert(new, key); self._order.insert(new, asset)
+        self.items_changed(new, 0, 1)
+
+def _runs(items):
+    """Groups (position, obj) pairs sorted by position into [(start, [obj...])] runs of consecutive positions."""
+    runs = []
+    for pos, obj in items:
+        if runs and pos == runs[-1][0] + len(runs[-1][1]): runs[-1][1].append(obj)
+        else: runs.append((pos, [obj]))
+    return runs
+
 class ProjectModel:
     def __init__(self): 
-        self.store = Gio.ListStore(item_type=AssetObject)
+        self.store = AssetListModel(on_wrap=self._watch)
+        self.search = SearchIndex()
+        self.duplicates = DuplicateIndex()
+        self._sort_keys = {} # asset id -> (title collation key, numeric year, insertion sequence)
+        self._added = {} # asset id -> insertion sequence
+        self._sequence = count()
+        self.on_sort_key_changed = None # Called with an asset whose title or year was edited
         self.metadata = ProjectMetadata() # Holds project settings
+        # Bumped by every edit; the model is dirty while it differs from the count last saved
+        self.change_count = 0
+        self.store.connect("items-changed", lambda *a: self.touch())
+        self.mark_saved()
+
+    @property
+    def dirty(self): return self.change_count != self.saved_count
+
+    def touch(self):
+        """Records an edit the model cannot see by itself, such as a metadata change."""
+        self.change_count += 1
+
+    def _watch(self, obj):
+        # Property setters emit notify, which is all a save needs to know about an edit
+        obj.connect("notify", self._on_asset_notify)
 
-    def add_asset(self, asset: PortfolioAsset): self.store.append(AssetObject(asset))
+    def _track(self, asset):
+        self.changed_ids.add(asset.id)
+        self.removed_ids.discard(asset.id)
+        self.order_changed = True
+
+    def _on_asset_notify(self, obj, pspec):
+        if pspec.name in UNSAVED_PROPERTIES: return
+        if obj.get_asset().id not in self.removed_ids:
+            self.changed_ids.add(obj.get_asset().id)
+            if pspec.name in SEARCHED_PROPERTIES: self.search.update(obj.get_asset())
+            if pspec.name in ("title", "year"):
+                self._sort_keys.pop(obj.get_asset().id, None)
+                if self.on_sort_key_changed: self.on_sort_key_changed(obj.get_asset())
+            if pspec.name == "dhash": self.duplicates.update(obj.get_asset())
+        self.touch()
+
+    def load(self, metadata, assets):
+        """Replaces the project with metadata and assets read from disk."""
+        self.clear()
+        self.metadata = metadata
+        self.add_assets(assets)
+        self.mark_saved()
+
+    def add_asset(self, asset: PortfolioAsset):
+        self.add_assets([asset])
+        return self.store.wrap(asset)
+    def sort_key(self, asset):
+        key = self._sort_keys.get(asset.id)
+        if key is None:
+            key = self._sort_keys[asset.id] = (collation_key(asset.title), year_key(asset.year), self._added.get(asset.id, 0))
+        return key
+
+    def add_assets(self, assets):
+        """Appends assets with a single splice, so the filter, sorter and grid update once. No wrappers are built."""
+        assets = list(assets)
+        if not assets: return
+        for a in assets: self._track(a); self._added[a.id] = next(self._sequence)
+        self.search.add(assets)
+        self.duplicates.add(assets)
+        self.store.splice(self.store.get_n_items(), 0, assets)
     def insert_asset_object(self, index, obj):
         if index < 0: index = 0
         if index > self.store.get_n_items(): index = self.store.get_n_items()
-        self.store.insert(index, obj)
-    def remove_asset_object(self, obj):
-        for i in range(self.store.get_n_items()):
-            if self.store.get_item(i) == obj: self.store.remove(i); break
-    def get_all_assets(self): return [self.store.get_item(i).get_asset() for i in range(self.store.get_n_items())]
+        self._track(obj.get_asset())
+        self._added.setdefault(obj.get_asset().id, next(self._sequence))
+        self.search.add([obj.get_asset()])
+        self.duplicates.add([obj.get_asset()])
+        self.store.insert_object(index, obj)
+    def index_of(self, obj): return self.store.index(obj.get_asset())
+    def get_asset_object(self, asset_id):
+        asset = self.store.find_id(asset_id)
+        return self.store.wrap(asset) if asset else None
+    def remove_asset_object(self, obj): return self.remove_asset_objects([obj])
+    def remove_asset_objects(self, objs):
+        """Removes objs with one splice per contiguous run and returns [(position, obj)] for restore_asset_objects()."""
+        positions = {self.index_of(o): o for o in objs}
+        removed = sorted(((i, o) for i, o in positions.items() if i >= 0), key=lambda x: x[0])
+        for start, run in reversed(_runs(removed)): # Back to front, so earlier positions stay valid
+            self.store.splice(start, len(run), [])
+        for _, o in removed:
+            self.changed_ids.discard(o.get_asset().id); self.removed_ids.add(o.get_asset().id)
+            self.search.remove(o.get_asset().id)
+            self.duplicates.remove(o.get_asset().id)
+        return removed
+    def restore_asset_objects(self, removed):
+        """Puts back what remove_asset_objects() returned, at the original positions."""
+        for start, run in _runs(sorted(removed, key=lambda x: x[0])):
+            for o in run: self.store.adopt(o); self._track(o.get_asset())
+            self.search.add(o.get_asset() for o in run)
+            self.duplicates.add(o.get_asset() for o in run)
+            self.store.splice(min(start, self.store.get_n_items()), 0, [o.get_asset() for o in run])
+    def get_all_assets(self): return self.store.assets()
     def clear(self): 
         self.store.remove_all()
+        self.search.clear()
+        self.duplicates.clear()
+        self._sort_keys.clear(); self._added.clear()
         self.metadata = ProjectMetadata() # Reset meta
+        self.mark_saved()
+
+    def mark_saved(self, count=None):
+        """Marks edits up to change count `count` as saved. Without one, everything is, and pending row changes are dropped too."""
+        if count is not None: self.saved_count = count; return
+        self.saved_count = self.change_count
+        self.changed_ids = set()
+        self.removed_ids = set()
+        self.order_changed = False
+
+    def take_changes(self):
+        """Returns (rows of changed assets, removed ids, asset ids in order or None if unchanged) and starts tracking afresh.
+
+        Rows are PortfolioAsset.values() tuples, as from snapshot().
+        """
+        assets = self.get_all_assets() if self.changed_ids or self.order_changed else []
+        changed = [a.values() for a in assets if a.id in self.changed_ids]
+        order = [a.id for a in assets] if self.order_changed else None
+        removed = self.removed_ids
+        self.changed_ids = set(); self.removed_ids = set(); self.order_changed = False
+        return changed, removed, order
+
+    def snapshot(self):
+        """A copy of the metadata and every asset's values(), cheap enough to take on the main thread.
+
+        Building assets again would re-run their __init__ for the whole project: that is left
+        to PortfolioAsset.from_values on the thread that serializes them.
+        """
+        return replace(self.metadata), list(map(_asset_values, self.get_all_assets()))
 
     def reorder_asset(self, old_index, new_index):
         if old_index == new_index: return
-        item = self.store.get_item(old_index)
+        asset = self.store.get_asset(old_index)
         self.store.remove(old_index)
         if old_index < new_index: new_index -= 1
         new_index = max(0, min(new_index, self.store.get_n_items()))
-        self.store.insert(new_index, item)
+        self.store.insert(new_index, asset)
+        self.order_changed = True
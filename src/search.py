@@ -0,0 +1,92 @@
+import re
+from bisect import bisect_left
+
+# Query syntax: whitespace-separated terms, all of which must match. A term is
+# a word prefix ("port" finds "Portrait"), optionally limited to one field with
+# field:prefix, e.g. tag:sketch year:2023 medium:oil.
+FIELDS = ("title", "tags", "medium", "year", "description")
+FIELD_ALIASES = {"title": "title", "tag": "tags", "tags": "tags", "medium": "medium",
+                 "year": "year", "desc": "description", "description": "description"}
+TOKEN_RE = re.compile(r"\w+")
+
+def tokenize(text): return TOKEN_RE.findall(text.lower())
+
+def parse_query(query):
+    """Returns [(field or None, prefix)] for query; None matches any field."""
+    terms = []
+    for part in query.split():
+        field, sep, value = part.partition(":")
+        field = FIELD_ALIASES.get(field.lower()) if sep else None
+        if not sep or field is None: value = part # Unknown field: search for the text as typed
+        terms.extend((field, t) for t in tokenize(value))
+    return terms
+
+def narrows(old, new):
+    """True if every asset matching query new is sure to match query old as well."""
+    new_terms = parse_query(new)
+    return all(any((f is None or f == nf) and nt.startswith(t) for nf, nt in new_terms) for f, t in parse_query(old))
+
+def _fields(asset):
+    return (("title", asset.title), ("tags", " ".join(asset.tags)), ("medium", asset.medium),
+            ("year", asset.year), ("description", asset.description))
+
+class SearchIndex:
+    """Inverted index from (field, token) to asset ids, kept current edit by edit.
+
+    Assets added in bulk (a project being opened) are only tokenized when the
+    first query needs them. Prefix lookups bisect a sorted vocabulary per field,
+    which is rebuilt only after new tokens appeared.
+    """
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._postings = {f: {} for f in FIELDS} # field -> token -> {asset id}
+        self._keys = {} # asset id -> [(field, token)] it is filed under
+        self._vocab = {f: None for f in FIELDS} # field -> sorted tokens, None when stale
+        self._pending = {}
+
+    def add(self, assets):
+        for a in assets: self._pending[a.id] = a
+
+    def update(self, asset):
+        self.remove(asset.id)
+        self._pending[asset.id] = asset
+
+    def remove(self, asset_id):
+        self._pending.pop(asset_id, None)
+        for field, token in self._keys.pop(asset_id, ()):
+            ids = self._postings[field][token]
+            ids.discard(asset_id)
+            if not ids: del self._postings[field][token]; self._vocab[field] = None
+
+    def _flush(self):
+        for asset_id, asset in self._pending.items():
+            keys = self._keys[asset_id] = {(f, t) for f, text in _fields(asset) for t in tokenize(text)}
+            for field, token in keys:
+                ids = self._postings[field].get(token)
+                if ids is None: ids = self._postings[field][token] = set(); self._vocab[field] = None
+                ids.add(asset_id)
+        self._pending.clear()
+
+    def _prefix(self, field, prefix):
+        vocab = self._vocab[field]
+        if vocab is None: vocab = self._vocab[field] = sorted(self._postings[field])
+        found = set()
+        for i in range(bisect_left(vocab, prefix), len(vocab)):
+            if not vocab[i].startswith(prefix): break
+            found |= self._postings[field][vocab[i]]
+        return found
+
+    def query(self, query):
+        """Ids of assets matching query, or None if it has no terms (everything matches)."""
+        terms = parse_query(query)
+        if not terms: return None
+        self._flush()
+        result = None
+        # Most selective terms are usually the longest; intersecting them first keeps sets small
+        for field, prefix in sorted(terms, key=lambda t: -len(t[1])):
+            ids = self._prefix(field, prefix) if field else set().union(*(self._prefix(f, prefix) for f in FIELDS))
+            result = ids if result is None else result & ids
+            if not result: break
+        return result
@@ -0,0 +1,103 @@
+import os
+import json
+import sqlite3
+from .models import PortfolioAsset, ProjectMetadata, ASSET_FIELDS
+
+PROJECT_EXT = ".curator"
+SCHEMA_VERSION = 1
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS assets (id TEXT PRIMARY KEY, position INTEGER);
+"""
+
+def is_project_store(path):
+    return path.endswith(PROJECT_EXT)
+
+def write_json_project(path, metadata, assets):
+    """Writes the JSON interchange format, through a temporary file so the old file survives a failed write."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as o:
+        json.dump({"metadata": metadata.to_dict(), "assets": [a.to_dict() for a in assets]}, o, indent=4)
+    os.replace(tmp_path, path)
+
+def _encode(asset):
+    # Lists (tags) are stored as JSON text, everything else as-is
+    return [json.dumps(v) if isinstance(v, list) else v for v in asset.values()]
+
+def _decode(names, row):
+    data = dict(zip(names, row))
+    data["tags"] = json.loads(data.get("tags") or "[]")
+    return PortfolioAsset.from_dict({k: v for k, v in data.items() if k in ASSET_FIELDS and v is not None})
+
+class ProjectStore:
+    """A .curator project file: one SQLite row per PortfolioAsset plus a metadata table.
+
+    save_all() rewrites the whole project (first save, Save As, imports);
+    save_changes() writes only the rows ProjectModel marked as changed, so
+    saving an edit costs the same however large the project is.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+
+    def _db(self):
+        if self._conn is None: self._conn = self._open(self.path)
+        return self._conn
+
+    def _open(self, path):
+        conn = sqlite3.connect(path, check_same_thread=False)
+        with conn as db:
+            db.executescript(SCHEMA)
+            # Fields added to PortfolioAsset after a file was written become new nullable columns
+            have = {r[1] for r in db.execute("PRAGMA table_info(assets)")}
+            for name in ASSET_FIELDS:
+                if name not in have: db.execute(f'ALTER TABLE assets ADD COLUMN "{name}"')
+            db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        return conn
+
+    def close(self):
+        if self._conn is not None: self._conn.close(); self._conn = None
+
+    def load(self):
+        """Returns (ProjectMetadata, [PortfolioAsset]) in project order."""
+        db = self._db()
+        meta = ProjectMetadata.from_dict({k: json.loads(v) for k, v in db.execute("SELECT key, value FROM metadata")})
+        cur = db.execute("SELECT * FROM assets ORDER BY position")
+        names = [d[0] for d in cur.description]
+        return meta, [_decode(names, row) for row in cur]
+
+    def _write_metadata(self, db, metadata):
+        db.executemany("INSERT OR REPLACE INTO metadata VALUES (?,?)", [(k, json.dumps(v)) for k, v in metadata.to_dict().items()])
+
+    def _upsert(self, db, assets):
+        cols = ", ".join(f'"{k}"' for k in ASSET_FIELDS)
+        updates = ", ".join(f'"{k}"=excluded."{k}"' for k in ASSET_FIELDS if k != "id")
+        db.executemany(f"INSERT INTO assets ({cols}) VALUES ({', '.join('?' * len(ASSET_FIELDS))}) ON CONFLICT(id) DO UPDATE SET {updates}",
+                       [_encode(a) for a in assets])
+
+    def save_all(self, metadata, assets):
+        # Built beside the target and swapped in, so a failed write leaves the old file intact
+        self.close()
+        tmp_path = f"{self.path}.tmp"
+        if os.path.exists(tmp_path): os.remove(tmp_path)
+        db = self._open(tmp_path)
+        try:
+            with db:
+                self._write_metadata(db, metadata)
+                self._upsert(db, assets)
+                db.executemany("UPDATE assets SET position=? WHERE id=?", [(i, a.id) for i, a in enumerate(assets)])
+        finally: db.close()
+        # A leftover journal of the old file must not be replayed into the new one
+        for suffix in ("-journal", "-wal", "-shm"):
+            try: os.remove(self.path + suffix)
+            except OSError: pass
+        os.replace(tmp_path, self.path)
+
+    def save_changes(self, metadata, changed, removed_ids, order=None):
+        """Writes changed assets, drops removed_ids and, if order (asset ids) is given, renumbers positions."""
+        db = self._db()
+        with db:
+            self._write_metadata(db, metadata)
+            if removed_ids: db.executemany("DELETE FROM assets WHERE id=?", [(i,) for i in removed_ids])
+            if changed: self._upsert(db, changed)
+            if order is not None: db.executemany("UPDATE assets SET position=? WHERE id=?", list(enumerate(order)))
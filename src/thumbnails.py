@@ -0,0 +1,165 @@
+import os
+import heapq
+import threading
+import multiprocessing
+from itertools import count
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, BrokenExecutor
+from .utils import generate_thumbnail
+
+# Lower runs first: cards on screen, cards next to them, everything else
+PRIORITY_VISIBLE, PRIORITY_NEAR, PRIORITY_BACKGROUND = range(3)
+
+class ThumbnailPool:
+    """Generates thumbnails in worker processes so Pillow decoding never blocks the UI.
+
+    Queued jobs run by priority and can be moved with prioritize() or demote()
+    until they start, so the grid can pull what is on screen ahead of a
+    background backlog.
+    A source submitted again while queued is merged into the one job.
+    A crashed worker breaks the whole executor and every job in it: the
+    executor is replaced, and those jobs run again one at a time, so only a
+    source that crashes a worker by itself is reported as failed.
+
+    Callbacks are invoked as callback(source_path, thumbnail_path, dhash) from a pool
+    thread, so GTK callers must hop back to the main loop with GLib.idle_add.
+    """
+    def __init__(self, max_workers=None, max_in_flight=None):
+        self.max_workers = max_workers or os.cpu_count() or 2
+        # Bounded hand-off: only this many jobs sit in the executor queue at once,
+        # the rest wait here and can still be reordered or dropped by cancel()
+        self.max_in_flight = max_in_flight or self.max_workers * 2
+        self._executor = None
+        self._heap = [] # (priority, seq, source_path); entries whose priority is outdated are skipped
+        self._jobs = {} # source_path -> [priority, callbacks, force, suspect]
+        self._suspects = deque() # Paths of jobs caught in a crash, run alone in _isolated
+        self._isolated = None
+        self._seq = count()
+        self._in_flight = set()
+        self._lock = threading.RLock()
+        self._generation = 0
+        self._closed = False
+
+    @property
+    def generation(self):
+        """Changes on every cancel(); pass it to submit() from code that may outlive the current project."""
+        return self._generation
+
+    def _get_executor(self):
+        if self._executor is None:
+            # spawn, not fork: forking a process with GTK initialised is unsafe
+            ctx = multiprocessing.get_context("spawn")
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=ctx)
+        return self._executor
+
+    def submit(self, source_path, callback, force=False, priority=PRIORITY_BACKGROUND, generation=None):
+        with self._lock:
+            if generation is not None and generation != self._generation: return
+            job = self._jobs.get(source_path)
+            if job is None:
+                self._jobs[source_path] = [priority, [callback], force, False]
+                heapq.heappush(self._heap, (priority, next(self._seq), source_path))
+            else:
+                job[1].append(callback); job[2] = job[2] or force
+                self.prioritize(source_path, priority)
+        self._pump()
+
+    def prioritize(self, source_path, priority):
+        """Raises a queued job to priority, never lowers it. Does nothing if source_path is not waiting to run."""
+        with self._lock:
+            job = self._jobs.get(source_path)
+            if job is None or priority >= job[0]: return
+            self._move(source_path, job, priority)
+
+    def demote(self, source_path):
+        """Sends a queued job back to PRIORITY_BACKGROUND, e.g. once its card has left the screen."""
+        with self._lock:
+            job = self._jobs.get(source_path)
+            if job is None or job[0] == PRIORITY_BACKGROUND: return
+            self._move(source_path, job, PRIORITY_BACKGROUND)
+
+    def _move(self, source_path, job, priority):
+        job[0] = priority
+        heapq.heappush(self._heap, (priority, next(self._seq), source_path))
+
+    def _requeue(self, source_path, job):
+        # Puts back a job _pump had taken off the queue
+        queued = self._jobs.get(source_path)
+        if queued is None:
+            queued = self._jobs[source_path] = job
+            if not job[3]: heapq.heappush(self._heap, (job[0], next(self._seq), source_path))
+        else: # Submitted again since it was taken
+            queued[1].extend(job[1]); queued[2] = queued[2] or job[2]
+            queued[3] = queued[3] or job[3]
+            self.prioritize(source_path, job[0])
+        if job[3]: self._suspects.append(source_path) # Not the heap: suspects only run alone
+
+    def _discard_executor(self, executor):
+        # A broken executor refuses all work; the next job starts a fresh one
+        if self._executor is executor:
+            self._executor = None
+            executor.shutdown(wait=False)
+
+    def _pump(self):
+        with self._lock:
+            while not self._closed and self._isolated is None and len(self._in_flight) < self.max_in_flight:
+                if self._suspects:
+                    if self._in_flight: return # Suspects wait for the executor to empty
+                    path = self._suspects.popleft()
+                    job = self._jobs.get(path)
+                    if job is None or not job[3]: continue
+                elif self._heap:
+                    priority, _, path = heapq.heappop(self._heap)
+                    job = self._jobs.get(path)
+                    if job is None or job[0] != priority or job[3]: continue # Already run, moved since, or a suspect
+                else: return
+                del self._jobs[path]
+                executor = self._get_executor()
+                try: fut = executor.submit(generate_thumbnail, path, job[2])
+                except BrokenExecutor:
+                    # A worker died since the last submit; this job never ran, so it goes straight back
+                    self._discard_executor(executor)
+                    self._requeue(path, job)
+                    continue
+                self._in_flight.add(fut)
+                if job[3]: self._isolated = fut
+                fut.add_done_callback(lambda f, p=path, j=job, e=executor, g=self._generation: self._on_done(f, p, j, e, g))
+
+    def _on_done(self, fut, path, job, executor, generation):
+        with self._lock:
+            self._in_flight.discard(fut)
+            stale = generation != self._generation
+            alone, retry = fut is self._isolated, False
+            if alone: self._isolated = None
+            if not stale and not fut.cancelled() and isinstance(fut.exception(), BrokenExecutor):
+                self._discard_executor(executor)
+                # Crashed with others in the executor: run it again alone to find out which one did it
+                retry = not alone and not self._closed
+                if retry:
+                    job[3] = True
+                    self._requeue(path, job)
+        if not stale and not fut.cancelled() and not retry:
+            try: thumb, dhash = fut.result()
+            except Exception: thumb, dhash = None, None
+            for callback in job[1]: callback(path, thumb, dhash)
+        self._pump()
+
+    def pending(self):
+        with self._lock: return len(self._jobs) + len(self._in_flight)
+
+    def cancel(self):
+        """Drop every queued job, e.g. when the project is closed. Jobs already running finish but are not reported."""
+        with self._lock:
+            self._generation += 1
+            self._heap.clear()
+            self._jobs.clear()
+            self._suspects.clear()
+            for fut in self._in_flight: fut.cancel()
+
+    def shutdown(self):
+        self.cancel()
+        with self._lock:
+            self._closed = True
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
@@ -1,10 +1,11 @@
+import time
 import gi
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
-from gi.repository import Gtk, Adw
+from gi.repository import Gtk, Adw, Gdk
 from ..config import get_available_themes
 from ..models import ProjectModel
-from ..utils import load_settings, save_settings
+from ..utils import load_settings, save_settings, rendition_path
 
 class PersonalInformationDialog(Adw.Window):
     """Dialog to edit Global Metadata"""
@@ -81,6 +82,7 @@ class PersonalInformationDialog(Adw.Window):
         m.social_link = settings["social_link"]
         m.cv_link = settings["cv_link"]
         m.bio = settings["bio"]
+        self.model.touch()
         
         if self.on_save_callback:
             self.on_save_callback()
@@ -132,6 +134,14 @@ class ThemeSelectionDialog(Adw.Window):
         content.append(Gtk.Label(label="Select a Theme", css_classes=["title-2"]))
         self.dropdown = Gtk.DropDown.new_from_strings([t[0] for t in self.themes])
         content.append(self.dropdown)
+        # Cards on the first page; the rest load while scrolling (0 = single page)
+        page_box = Gtk.Box(spacing=10)
+        page_box.append(Gtk.Label(label="Cards per page", hexpand=True, xalign=0))
+        self.page_size = Gtk.SpinButton.new_with_range(0, 1000, 10)
+        self.page_size.set_value(load_settings().get("export_page_size", 60))
+        self.page_size.set_tooltip_text("0 puts every card on a single page")
+        page_box.append(self.page_size)
+        content.append(page_box)
         btn_box = Gtk.Box(spacing=10, halign=Gtk.Align.CENTER)
         cancel = Gtk.Button(label="Cancel"); cancel.connect("clicked", lambda x: self.close())
         export = Gtk.Button(label="Next", css_classes=["suggested-action"]); export.connect("clicked", self.on_next)
@@ -139,10 +149,45 @@ class ThemeSelectionDialog(Adw.Window):
         content.append(btn_box)
     def on_next(self, btn):
         idx = self.dropdown.get_selected()
-        if idx != Gtk.INVALID_LIST_POSITION: self.close(); self.on_confirm(self.themes[idx][1])
+        if idx == Gtk.INVALID_LIST_POSITION: return
+        page_size = self.page_size.get_value_as_int()
+        settings = load_settings()
+        settings["export_page_size"] = page_size
+        save_settings(settings)
+        self.close(); self.on_confirm(self.themes[idx][1], page_size)
+
+class ExportProgressDialog(Adw.Window):
+    """Shows per-asset progress and an ETA for a running export"""
+    def __init__(self, parent, title, on_cancel):
+        super().__init__(modal=True, transient_for=parent, title=title, default_width=400, default_height=200, deletable=False)
+        self.on_cancel = on_cancel
+        self.start_time = time.monotonic()
+        content = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=20, margin_top=30, margin_bottom=30, margin_start=30, margin_end=30)
+        self.set_content(content)
+        content.append(Gtk.Label(label=title, css_classes=["title-2"]))
+        self.bar = Gtk.ProgressBar(show_text=True)
+        content.append(self.bar)
+        self.status = Gtk.Label(label="Preparing...", css_classes=["dim-label"])
+        content.append(self.status)
+        self.cancel_btn = Gtk.Button(label="Cancel", halign=Gtk.Align.CENTER); self.cancel_btn.connect("clicked", self.on_cancel_clicked)
+        content.append(self.cancel_btn)
+
+    def update(self, done, total):
+        self.bar.set_fraction(done / total if total else 1.0)
+        self.bar.set_text(f"{done} / {total}")
+        elapsed = time.monotonic() - self.start_time
+        if self.cancel_btn.get_sensitive() and 0 < done < total:
+            remaining = int(elapsed / done * (total - done))
+            self.status.set_label(f"About {remaining // 60}:{remaining % 60:02d} remaining")
+        return False
+
+    def on_cancel_clicked(self, btn):
+        btn.set_sensitive(False)
+        self.status.set_label("Cancelling...")
+        self.on_cancel()
 
 class ImageViewerWindow(Adw.Window):
-    def __init__(self, parent, obj):
+    def __init__(self, parent, obj, textures):
         super().__init__(transient_for=parent, title=obj.title, default_width=1000, default_height=800)
         
         # Header
@@ -151,12 +196,14 @@ class ImageViewerWindow(Adw.Window):
         # Content
         scrolled = Gtk.ScrolledWindow()
         
-        try:
-            pic = Gtk.Picture.new_for_filename(obj.source_path)
-            pic.set_content_fit(Gtk.ContentFit.SCALE_DOWN)
-            scrolled.set_child(pic)
-        except:
-            scrolled.set_child(Gtk.Label(label="Could not load image"))
+        # Open on the largest cached rendition, swap in the original once it is decoded
+        self.pic = Gtk.Picture(content_fit=Gtk.ContentFit.SCALE_DOWN)
+        scrolled.set_child(self.pic)
+        self.original_shown = False
+        preview = rendition_path(obj.thumbnail_path, 1000 * parent.get_scale_factor())
+        self.loads = [textures.load(preview, self.show_preview) if preview else None,
+                      textures.load(obj.source_path, self.show_original)]
+        self.connect("close-request", lambda w: [c.cancel() for c in self.loads if c] and False)
             
         box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
         box.append(header)
@@ -165,6 +212,14 @@ class ImageViewerWindow(Adw.Window):
         
         self.set_content(box)
 
+    def show_preview(self, texture):
+        if texture and not self.original_shown: self.pic.set_paintable(texture)
+
+    def show_original(self, texture):
+        self.original_shown = True
+        if texture: self.pic.set_paintable(texture)
+        elif not self.pic.get_paintable(): self.pic.get_parent().set_child(Gtk.Label(label="Could not load image"))
+
 class PaletteDialog(Adw.Window):
     def __init__(self, parent, colors):
         super().__init__(modal=True, transient_for=parent, title="Color Palette", default_width=500, default_height=300)
@@ -218,3 +273,44 @@ class PaletteDialog(Adw.Window):
         Gdk.Display.get_default().get_clipboard().set(color)
         # Maybe show a small toast or label change?
         btn.set_tooltip_text("Copied!")
+
+class DuplicatesDialog(Adw.Window):
+    """Groups of likely duplicate assets, each with a button to remove it from the project"""
+    MAX_GROUPS = 200 # Largest groups first; a project full of near-identical scans would otherwise build thousands of rows
+
+    def __init__(self, parent, model, groups, textures, on_remove):
+        super().__init__(transient_for=parent, title="Duplicates", default_width=600, default_height=700)
+        self.on_remove = on_remove
+        self.loads = []
+        self.connect("close-request", lambda w: [c.cancel() for c in self.loads if c] and False)
+
+        page = Adw.PreferencesPage()
+        if len(groups) > self.MAX_GROUPS:
+            page.set_description(f"Showing the {self.MAX_GROUPS} largest of {len(groups)} groups")
+        px = 64 * parent.get_scale_factor()
+        for ids in groups[:self.MAX_GROUPS]:
+            # Assets removed since the search ran are left out
+            objs = [o for o in map(model.get_asset_object, ids) if o]
+            if len(objs) < 2: continue
+            group = Adw.PreferencesGroup(title=f"{len(objs)} similar images")
+            for obj in objs:
+                row = Adw.ActionRow(title=obj.title, subtitle=obj.source_path, subtitle_lines=1)
+                pic = Gtk.Picture(content_fit=Gtk.ContentFit.COVER, width_request=64, height_request=64, css_classes=["card"])
+                row.add_prefix(pic)
+                path = rendition_path(obj.thumbnail_path, px)
+                if path: self.loads.append(textures.load(path, lambda texture, pic=pic: texture and pic.set_paintable(texture)))
+                btn = Gtk.Button(icon_name="user-trash-symbolic", tooltip_text="Remove from Project", valign=Gtk.Align.CENTER, css_classes=["flat"])
+                btn.connect("clicked", self.on_remove_clicked, obj, group, row)
+                row.add_suffix(btn)
+                group.add(row)
+            page.add(group)
+
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        box.append(Adw.HeaderBar())
+        box.append(page)
+        page.set_vexpand(True)
+        self.set_content(box)
+
+    def on_remove_clicked(self, btn, obj, group, row):
+        self.on_remove(obj)
+        group.remove(row)
@@ -7,6 +7,7 @@ from gi.repository import Gtk, Adw, Pango, GLib, Gio
 import json
 from .dialogs import TitleInputDialog, PersonalInformationDialog
 from ..models import ProjectModel
+from ..store import PROJECT_EXT
 from ..utils import load_recent_projects, remove_recent_project, load_settings, save_recent_projects
 
 class WelcomeWindow(Adw.Window):
@@ -256,6 +257,7 @@ class WelcomeWindow(Adw.Window):
          filters = Gio.ListStore.new(Gtk.FileFilter)
          f = Gtk.FileFilter()
          f.set_name("Portfolio Files")
+         f.add_pattern("*" + PROJECT_EXT)
          f.add_pattern("*.json")
          filters.append(f)
          d.set_filters(filters)
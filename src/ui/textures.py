@@ -0,0 +1,86 @@
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import gi
+gi.require_version('Gtk', '4.0')
+from gi.repository import Gdk, GLib, Gio
+
+DEFAULT_BUDGET_MB = 256
+
+def texture_bytes(texture): return texture.get_width() * texture.get_height() * 4
+
+class TextureCache:
+    """Decoded textures by file path, evicting least recently used ones beyond a budget in megabytes.
+
+    Sizes are counted as 4 bytes per pixel, what GTK keeps resident per texture.
+    Main thread only.
+    """
+    def __init__(self, budget_mb=DEFAULT_BUDGET_MB):
+        self.budget = int(budget_mb * 1024 * 1024)
+        self._textures = OrderedDict()
+        self.resident = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path):
+        texture = self._textures.get(path)
+        if texture is None: self.misses += 1; return None
+        self._textures.move_to_end(path)
+        self.hits += 1
+        return texture
+
+    def put(self, path, texture):
+        # A full-size original could push out every card on screen; those are not kept
+        if texture_bytes(texture) > self.budget // 4: return
+        self.invalidate(path)
+        self._textures[path] = texture
+        self.resident += texture_bytes(texture)
+        while self.resident > self.budget:
+            _, old = self._textures.popitem(last=False)
+            self.resident -= texture_bytes(old)
+
+    def invalidate(self, path):
+        old = self._textures.pop(path, None)
+        if old is not None: self.resident -= texture_bytes(old)
+
+    def stats(self):
+        return f"textures: {len(self._textures)} resident, {self.resident / 1048576:.1f} MB, {self.hits} hits, {self.misses} misses"
+
+class TextureLoader:
+    """Decodes image files into Gdk.Textures on worker threads and hands them back on the main loop, through a shared TextureCache."""
+    def __init__(self, budget_mb=DEFAULT_BUDGET_MB, max_workers=4):
+        self.cache = TextureCache(budget_mb)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="texture")
+        # CURATOR_DEBUG_TEXTURES=1 logs the cache counters every few seconds
+        if os.environ.get("CURATOR_DEBUG_TEXTURES"): GLib.timeout_add_seconds(5, self._log_stats)
+
+    def load(self, path, callback):
+        """Calls callback(texture or None) on the main loop, unless the returned Gio.Cancellable is cancelled first.
+
+        A cached texture is passed to callback right away and None is returned.
+        """
+        texture = self.cache.get(path)
+        if texture is not None: callback(texture); return None
+        cancellable = Gio.Cancellable()
+        self._pool.submit(self._decode, path, callback, cancellable)
+        return cancellable
+
+    def _decode(self, path, callback, cancellable):
+        # Cards scrolled past before their turn never get decoded
+        if cancellable.is_cancelled(): return
+        try: texture = Gdk.Texture.new_from_filename(path) # Thread-safe in GTK 4
+        except GLib.Error: texture = None
+        GLib.idle_add(self._deliver, path, texture, callback, cancellable)
+
+    def _deliver(self, path, texture, callback, cancellable):
+        # Kept even if nobody waits anymore: the card may well scroll back
+        if texture is not None: self.cache.put(path, texture)
+        if not cancellable.is_cancelled(): callback(texture)
+        return False
+
+    def _log_stats(self):
+        print(self.cache.stats())
+        return True
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -3,16 +3,29 @@ import sys
 import json
 import threading
 import subprocess
+from dataclasses import replace
+from concurrent.futures import ThreadPoolExecutor
 import gi
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw, Gio, GObject, Gdk, GLib
 
 from ..config import ensure_templates, APP_DIR
-from ..models import ProjectModel, PortfolioAsset, ProjectMetadata
-from ..utils import generate_thumbnail, rotate_image, extract_palette, load_settings, save_settings
-from ..export import export_portfolio_html, export_portfolio_pdf, HAS_REPORTLAB
-from .dialogs import PersonalInformationDialog, ThemeSelectionDialog, ImageViewerWindow, PaletteDialog, TitleInputDialog
+from ..models import ProjectModel, PortfolioAsset, ProjectMetadata, SortedAssetView
+from ..utils import rotate_image, extract_palette, load_settings, save_settings, rendition_path, is_image_path, scan_images
+from ..thumbnails import ThumbnailPool, PRIORITY_VISIBLE, PRIORITY_NEAR, PRIORITY_BACKGROUND
+from ..search import parse_query, narrows
+from ..watcher import SourceWatcher
+from ..dedup import group_duplicates
+from ..store import ProjectStore, PROJECT_EXT, is_project_store, write_json_project
+from ..export import export_portfolio_html, export_portfolio_pdf, HAS_REPORTLAB, PDF_DPI
+from .textures import TextureLoader, DEFAULT_BUDGET_MB as TEXTURE_BUDGET_MB
+from .dialogs import PersonalInformationDialog, ThemeSelectionDialog, ImageViewerWindow, PaletteDialog, TitleInputDialog, ExportProgressDialog, DuplicatesDialog
+
+# Cards either side of a visible one whose missing thumbnails are pulled forward
+THUMBNAIL_NEIGHBOURS = 12
+# Images found by a folder import are added to the project this many at a time
+IMPORT_BATCH = 300
 
 # Load UI content
 template_args = {}
@@ -33,6 +46,7 @@ class PortfolioWindow(Adw.ApplicationWindow):
     toast_overlay = Gtk.Template.Child()
     split_view = Gtk.Template.Child()
     sidebar_stack = Gtk.Template.Child()
+    detail_preview = Gtk.Template.Child()
     ent_title = Gtk.Template.Child()
     ent_desc = Gtk.Template.Child()
     ent_med = Gtk.Template.Child()
@@ -55,6 +69,15 @@ class PortfolioWindow(Adw.ApplicationWindow):
         self.model = ProjectModel()
         self.current_obj = None
         self.project_path = None
+        self.project_store = None # Open .curator file the model's pending changes are relative to
+        self.saved_path = None # Where the model was last loaded from or saved to, at model.saved_count
+        self.save_epoch = 0 # Bumped when saves still in flight no longer count: another project was opened or a save failed
+        self.saver = ThreadPoolExecutor(max_workers=1) # One writer, so saves land in the order they were taken
+        self.thumbnailer = ThumbnailPool()
+        self.textures = TextureLoader(load_settings().get("texture_cache_mb", TEXTURE_BUDGET_MB))
+        self.watcher = SourceWatcher(self.on_sources_changed)
+        self.new_imports = set() # Ids of assets added this session whose hash is still to be checked for duplicates
+        self.import_duplicates = 0
         
         # Auto-save every 5 minutes (300 seconds)
         GLib.timeout_add_seconds(300, self.auto_save)
@@ -65,16 +88,21 @@ class PortfolioWindow(Adw.ApplicationWindow):
         self.sidebar_stack.set_visible_child_name("empty")
 
         # Setup GridView with Search Filter and Sorter
-        self.filter = Gtk.CustomFilter.new(self.filter_func)
-        self.filter_model = Gtk.FilterListModel(model=self.model.store, filter=self.filter)
-        
-        self.sorter = Gtk.CustomSorter.new(self.sort_func, None)
-        self.sort_model = Gtk.SortListModel(model=self.filter_model, sorter=self.sorter)
+        # No match function while the search is empty, so GTK never asks about each item
+        self.filter = Gtk.CustomFilter()
+        self.search_query = ""
+        self.search_matches = None # Asset ids matching search_query, recomputed lazily
+        # Connected ahead of the filter model, so cached matches are dropped before it filters new items
+        self.model.store.connect("items-changed", self.on_items_changed)
+        # Sorted from cached keys ahead of filtering; Manual order is the store itself
+        self.sort_view = SortedAssetView(self.model)
+        self.filter_model = Gtk.FilterListModel(model=self.sort_view, filter=self.filter)
 
         fac = Gtk.SignalListItemFactory()
         fac.connect("setup", self.setup_item)
         fac.connect("bind", self.bind_item)
-        self.sel_model = Gtk.MultiSelection(model=self.sort_model)
+        fac.connect("unbind", self.unbind_item)
+        self.sel_model = Gtk.MultiSelection(model=self.filter_model)
         self.sel_model.connect("selection-changed", self.on_sel)
         self.grid_view.set_model(self.sel_model)
         self.grid_view.set_factory(fac)
@@ -100,13 +128,14 @@ class PortfolioWindow(Adw.ApplicationWindow):
         self.n_buf = self.n_view.get_buffer()
         self.n_buf.connect("changed", self.on_note_change)
         
-        self.model.store.connect("items-changed", lambda s,p,r,a: self.stack.set_visible_child_name("empty" if s.get_n_items()==0 else "grid"))
         if self.model.store.get_n_items()==0: self.stack.set_visible_child_name("empty")
 
         # Actions
         self.install_action("new", None, self.on_new)
         self.install_action("settings", None, self.on_settings)
         self.install_action("import", None, self.on_import)
+        self.install_action("add_folder", None, self.on_add_folder)
+        self.install_action("find_duplicates", None, self.on_find_duplicates)
         self.install_action("save", None, self.on_save)
         self.install_action("export_html", None, self.on_export_html)
         self.install_action("export_pdf", None, self.on_export_pdf)
@@ -120,6 +149,10 @@ class PortfolioWindow(Adw.ApplicationWindow):
     
     def do_close_request(self):
         if self.force_close:
+            self.thumbnailer.shutdown()
+            self.textures.shutdown()
+            self.watcher.clear()
+            self.saver.shutdown(wait=True)
             return False
             
         dialog = Adw.MessageDialog(
@@ -142,11 +175,11 @@ class PortfolioWindow(Adw.ApplicationWindow):
     def on_close_response(self, dialog, response):
         if response == "save":
             if self.project_path:
-                self.auto_save()
+                self.save_project(self.project_path, wait=True)
                 self.force_close = True
                 self.close()
             else:
-                name = self.model.metadata.portfolio_title + ".json" if self.model.metadata.portfolio_title else "portfolio.json"
+                name = (self.model.metadata.portfolio_title or "portfolio") + PROJECT_EXT
                 d=Gtk.FileDialog(initial_name=name)
                 d.save(self, None, self.do_save_finish_close_req)
         elif response == "discard":
@@ -158,7 +191,7 @@ class PortfolioWindow(Adw.ApplicationWindow):
             f=d.save_finish(r)
             path = f.get_path()
             self.project_path = path
-            self.auto_save()
+            self.save_project(path, wait=True)
             self.force_close = True
             self.close()
         except: pass
@@ -167,45 +200,95 @@ class PortfolioWindow(Adw.ApplicationWindow):
         try:
             target_path = self.project_path
             if not target_path:
-                target_path = os.path.join(APP_DIR, "autosave.json")
+                target_path = os.path.join(APP_DIR, "autosave" + PROJECT_EXT)
                 os.makedirs(APP_DIR, exist_ok=True)
-            
-            payload = {
-                "metadata": self.model.metadata.to_dict(),
-                "assets": [a.to_dict() for a in self.model.get_all_assets()]
-            }
-            with open(target_path, 'w') as o: json.dump(payload, o, indent=4)
+            self.save_project(target_path)
         except Exception as e: print(f"Auto-save failed: {e}")
         return True # Keep timer running
 
+    def save_project(self, path, wait=False, toast=None):
+        """Saves the project to path, skipping it entirely if nothing changed since it was last saved there.
+
+        The model is snapshotted here on the main thread and written by the saver
+        thread; wait blocks until the write is done. A .curator file the model
+        was loaded from or last saved to only gets the changed rows, any other
+        target is written in full. toast is shown once a successful save lands.
+        """
+        m = self.model
+        if path == self.saved_path and not m.dirty:
+            if toast: self.toast_overlay.add_toast(Adw.Toast.new(toast))
+            return
+        count = m.change_count
+        # Snapshots hold asset rows; they become assets again on the saver thread
+        assets = lambda rows: [PortfolioAsset.from_values(r) for r in rows]
+        if not is_project_store(path):
+            write = lambda meta, rows: write_json_project(path, meta, assets(rows))
+            data = m.snapshot()
+        elif self.project_store is None or self.project_store.path != path or self.saved_path != path:
+            self.close_project_store()
+            store = self.project_store = ProjectStore(path)
+            write = lambda meta, rows: store.save_all(meta, assets(rows))
+            data = m.snapshot(); m.take_changes()
+        else:
+            store = self.project_store
+            write = lambda meta, rows, removed, order: store.save_changes(meta, assets(rows), removed, order)
+            data = (replace(m.metadata),) + m.take_changes()
+        job = self.saver.submit(self.write_project, path, write, data)
+        epoch = self.save_epoch
+        done = lambda ok: self.on_project_saved(path, epoch, count, ok, toast)
+        if wait: done(job.result())
+        else: job.add_done_callback(lambda f: GLib.idle_add(done, f.result()))
+
+    def write_project(self, path, write, data):
+        # Runs on the saver thread, only ever on snapshots
+        try:
+            write(*data)
+            return True
+        except Exception as e:
+            print(f"Saving {path} failed: {e}")
+            return False
+
+    def on_project_saved(self, path, epoch, count, ok, toast):
+        if epoch != self.save_epoch: return False
+        if ok:
+            self.model.mark_saved(count); self.saved_path = path
+            if toast: self.toast_overlay.add_toast(Adw.Toast.new(toast))
+        else:
+            # Row changes taken for this save are lost, so the next save to this file is a full one
+            self.saved_path = None
+            self.save_epoch += 1
+            self.toast_overlay.add_toast(Adw.Toast.new("Save Failed"))
+        return False
+
+    def close_project_store(self):
+        # Closed on the saver thread, after any write still queued for it
+        if self.project_store: self.saver.submit(self.project_store.close)
+        self.project_store = None
+        self.saved_path = None
+        self.save_epoch += 1
+
     def filter_func(self, item, *args):
-        query = self.search_entry.get_text().lower()
-        if not query: return True
-        return query in item.title.lower() or query in item.tags_string.lower()
+        if self.search_matches is None: self.search_matches = self.model.search.query(self.search_query) or set()
+        return item.get_asset().id in self.search_matches
 
     def on_search_changed(self, entry):
-        self.filter.changed(Gtk.FilterChange.DIFFERENT)
-
-    def sort_func(self, a, b, *args):
-        idx = self.sort_dropdown.get_selected()
-        if idx == 0: 
-            return 0 # Maintain original order? No, GtkSorter needs comparison.
-            # Let's use ID or title for stability if 0.
-            # Better: if we want "Date Added" effectively means "Unsorted" relative to the store?
-            # CustomSorter with 0 implies equality.
-            pass
-        elif idx == 1: # Title A-Z
-            return (a.title.lower() > b.title.lower()) - (a.title.lower() < b.title.lower())
-        elif idx == 2: # Year Created
-            # Handle empty years
-            ya = a.year or "0"
-            yb = b.year or "0"
-            return (ya > yb) - (ya < yb)
-        return 0
+        old, query = self.search_query, entry.get_text()
+        if not parse_query(query) and not parse_query(old): self.search_query = query; return
+        self.search_query = query; self.search_matches = None
+        if not parse_query(query): self.filter.set_filter_func(None) # Everything matches
+        elif not parse_query(old): self.filter.set_filter_func(self.filter_func)
+        # Hints let GTK re-check only the items currently shown (narrower) or hidden (wider)
+        elif narrows(old, query): self.filter.changed(Gtk.FilterChange.MORE_STRICT)
+        elif narrows(query, old): self.filter.changed(Gtk.FilterChange.LESS_STRICT)
+        else: self.filter.changed(Gtk.FilterChange.DIFFERENT)
+
+    def on_items_changed(self, store, position, removed, added):
+        self.stack.set_visible_child_name("empty" if store.get_n_items()==0 else "grid")
+        # New assets are not in the cached matches
+        if added: self.search_matches = None
 
     def on_sort_changed(self, *args):
-        self.sorter.set_sort_func(self.sort_func, None)
-        self.sorter.changed(Gtk.SorterChange.DIFFERENT)
+        self.sort_view.set_mode(self.sort_dropdown.get_selected())
 
     # --- LOGIC ---
     # def on_back_clicked(self, btn):
@@ -234,11 +317,11 @@ class PortfolioWindow(Adw.ApplicationWindow):
     def do_save_and_close(self):
         # reuse save logic but then close
         if self.project_path:
-            self.auto_save()
+            self.save_project(self.project_path, wait=True)
             self.get_application().show_welcome()
             self.close()
         else:
-            name = self.model.metadata.portfolio_title + ".json" if self.model.metadata.portfolio_title else "portfolio.json"
+            name = (self.model.metadata.portfolio_title or "portfolio") + PROJECT_EXT
             d=Gtk.FileDialog(initial_name=name)
             d.save(self, None, self.do_save_finish_and_close)
             
@@ -247,7 +330,7 @@ class PortfolioWindow(Adw.ApplicationWindow):
             f=d.save_finish(r)
             path = f.get_path()
             self.project_path = path
-            self.auto_save()
+            self.save_project(path, wait=True)
             self.get_application().show_welcome()
             self.close()
         except Exception as e: print(e)
@@ -260,17 +343,140 @@ class PortfolioWindow(Adw.ApplicationWindow):
     def do_add_finish(self, d, r):
         try:
             files = d.open_multiple_finish(r)
-            if files:
-                for f in files:
-                    self.add_path(f.get_path())
+            if files: self.add_paths(f.get_path() for f in files)
         except Exception as e:
             print(f"Error adding files: {e}")
     
-    def add_path(self, p):
-        if p and os.path.splitext(p)[1].lower() in {".png",".jpg",".jpeg",".webp",".svg"}:
-            self.model.add_asset(PortfolioAsset(title=os.path.basename(p), source_path=p, thumbnail_path=generate_thumbnail(p)))
+    def on_add_folder(self, a, p):
+        d=Gtk.FileDialog(title="Select Folders", accept_label="Add")
+        d.select_multiple_folders(self, None, self.do_add_folder_finish)
+
+    def do_add_folder_finish(self, d, r):
+        try:
+            folders = d.select_multiple_folders_finish(r)
+            if folders: self.add_paths(f.get_path() for f in folders)
+        except Exception as e:
+            print(f"Error adding folders: {e}")
+
+    def add_paths(self, paths):
+        files, folders = [], []
+        for p in paths:
+            if not p: continue
+            if os.path.isdir(p): folders.append(p)
+            elif is_image_path(p): files.append(p)
+        self.add_image_files(files)
+        if folders: self.import_folders(folders)
+
+    def add_image_files(self, paths):
+        assets = [PortfolioAsset(title=os.path.basename(p), source_path=p) for p in paths]
+        # Show the cards right away, thumbnails are filled in once the pool is done with them
+        self.model.add_assets(assets)
+        self.new_imports.update(a.id for a in assets)
+        self.watcher.watch(paths)
+        for a in assets: self.queue_thumbnail(a)
+
+    def import_folders(self, folders):
+        # Walked off the main thread; found images are handed over a batch at a time so the
+        # grid fills in while the scan goes on. A project closed meanwhile ends the import
+        toast = Adw.Toast(title="Importing…", timeout=0)
+        self.toast_overlay.add_toast(toast)
+        generation = self.thumbnailer.generation
+        def scan():
+            batch, total = [], 0
+            for folder in folders:
+                for path in scan_images(folder):
+                    if generation != self.thumbnailer.generation:
+                        # Stale, so on_import_batch only takes the toast down
+                        GLib.idle_add(self.on_import_batch, [], total, toast, generation, True)
+                        return
+                    batch.append(path)
+                    if len(batch) == IMPORT_BATCH:
+                        total += len(batch)
+                        GLib.idle_add(self.on_import_batch, batch, total, toast, generation)
+                        batch = []
+            GLib.idle_add(self.on_import_batch, batch, total + len(batch), toast, generation, True)
+        threading.Thread(target=scan, daemon=True).start()
+
+    def on_import_batch(self, paths, total, toast, generation, finished=False):
+        if generation != self.thumbnailer.generation: toast.dismiss(); return False
+        self.add_image_files(paths)
+        if not finished: toast.set_title(f"Importing… {total} images"); return False
+        toast.dismiss()
+        self.toast_overlay.add_toast(Adw.Toast.new(f"Imported {total} images" if total else "No images found"))
+        return False
+
+    def queue_thumbnail(self, asset, force=False, priority=PRIORITY_BACKGROUND, generation=None):
+        self.thumbnailer.submit(asset.source_path, lambda src, thumb, dhash: GLib.idle_add(self.on_thumbnail_ready, asset, thumb, dhash),
+                                force, priority, generation)
+
+    def check_files(self):
+        # Sources may have gone, and thumbnails are gone after a cache wipe or on another machine.
+        # Checked off the main thread; missing thumbnails are rebuilt in the background, and
+        # cards on screen jump the queue as they bind
+        assets = self.model.get_all_assets()
+        self.watcher.watch(a.source_path for a in assets)
+        generation = self.thumbnailer.generation
+        def scan():
+            missing = []
+            for a in assets:
+                if not a.source_path: continue
+                if not os.path.exists(a.source_path): missing.append(a.source_path)
+                # Projects from before perceptual hashing get theirs from the thumbnail cache
+                elif not (a.thumbnail_path and os.path.exists(a.thumbnail_path)) or not a.dhash:
+                    self.queue_thumbnail(a, generation=generation)
+            if missing: GLib.idle_add(self.on_sources_changed, set(), set(missing), generation)
+        threading.Thread(target=scan, daemon=True).start()
+
+    def on_sources_changed(self, changed, removed, generation=None):
+        # Edited sources hash differently, so queueing them is enough to get fresh thumbnails
+        if generation is not None and generation != self.thumbnailer.generation: return False
+        for asset in self.model.get_all_assets():
+            if asset.source_path not in changed and asset.source_path not in removed: continue
+            missing = asset.source_path in removed
+            if asset.missing != missing: self.model.get_asset_object(asset.id).missing = missing
+            if not missing:
+                self.textures.cache.invalidate(asset.source_path)
+                self.queue_thumbnail(asset)
+        return False
+
+    def on_thumbnail_ready(self, asset, thumb, dhash):
+        # Looked up again, so no wrapper is kept alive while the thumbnail is pending
+        obj = self.model.get_asset_object(asset.id)
+        if not (thumb and obj and obj.get_asset() is asset): return False
+        obj.thumbnail_path = thumb
+        if dhash and obj.dhash != dhash: obj.dhash = dhash
+        if asset.id in self.new_imports:
+            self.new_imports.discard(asset.id)
+            if self.model.duplicates.similar(asset.id): self.note_import_duplicate()
+        return False
+
+    def note_import_duplicate(self):
+        # Counted for a moment, so an import says it once rather than per image
+        self.import_duplicates += 1
+        if self.import_duplicates == 1: GLib.timeout_add_seconds(2, self.show_import_duplicates)
+
+    def show_import_duplicates(self):
+        n, self.import_duplicates = self.import_duplicates, 0
+        title = f"{n} new images look like duplicates" if n > 1 else "A new image looks like a duplicate"
+        self.toast_overlay.add_toast(Adw.Toast(title=title, button_label="Review", action_name="win.find_duplicates"))
+        return False
+
+    def on_find_duplicates(self, a, p):
+        # Grouping a large project takes seconds: done on a copy of the hashes, off the main thread
+        hashes = self.model.duplicates.snapshot()
+        generation = self.thumbnailer.generation
+        toast = Adw.Toast(title="Looking for duplicates…", timeout=0)
+        self.toast_overlay.add_toast(toast)
+        threading.Thread(target=lambda: GLib.idle_add(self.show_duplicates, group_duplicates(hashes), toast, generation), daemon=True).start()
+
+    def show_duplicates(self, groups, toast, generation):
+        toast.dismiss()
+        if generation != self.thumbnailer.generation: return False
+        if groups: DuplicatesDialog(self, self.model, groups, self.textures, self.on_delete_asset).present()
+        else: self.toast_overlay.add_toast(Adw.Toast.new("No duplicates found"))
+        return False
             
-    def on_drop(self, t, v, x, y): [self.add_path(f.get_path()) for f in v.get_files()]; return True
+    def on_drop(self, t, v, x, y): self.add_paths(f.get_path() for f in v.get_files()); return True
     
     def on_delete(self, b):
         # Bulk Delete
@@ -285,19 +491,9 @@ class PortfolioWindow(Adw.ApplicationWindow):
         
         if not to_remove: return
 
-        # Prepare Undo Data
-        undo_data = []
-        store = self.model.store
-        for obj in to_remove:
-            for i in range(store.get_n_items()):
-                if store.get_item(i) == obj:
-                    undo_data.append((i, obj))
-                    break
-        
-        # Remove
-        for obj in to_remove:
-            self.model.remove_asset_object(obj)
-            
+        # Remove, keeping positions for undo
+        undo_data = self.model.remove_asset_objects(to_remove)
+        
         # Toast
         toast = Adw.Toast.new(f"Deleted {len(to_remove)} items")
         toast.set_button_label("Undo")
@@ -305,22 +501,20 @@ class PortfolioWindow(Adw.ApplicationWindow):
         self.toast_overlay.add_toast(toast)
 
     def restore_items(self, data):
-        # Sort by index ascending to restore positions
-        data.sort(key=lambda x: x[0])
-        for i, obj in data:
-            self.model.insert_asset_object(i, obj)
+        self.model.restore_asset_objects(data)
 
     def on_add_tag(self, widget):
-        text = self.ent_new_tag.get_text().strip()
+        text = sys.intern(self.ent_new_tag.get_text().strip())
         if not text: return
 
         bitset = self.sel_model.get_selection()
         size = bitset.get_size()
         
         if size == 1 and self.current_obj:
-            tags = self.current_obj.get_asset().tags
-            if text not in tags:
-                tags.append(text)
+            asset = self.current_obj.get_asset()
+            if text not in asset.tags:
+                # A new list, not append(): saves in flight may still hold the old one
+                asset.tags = asset.tags + [text]
                 self.current_obj.notify("tags-string")
                 self.update_tag_view()
         elif size > 1:
@@ -328,9 +522,9 @@ class PortfolioWindow(Adw.ApplicationWindow):
             def apply_tag(i, *args):
                 obj = self.sel_model.get_item(i)
                 if obj:
-                    tags = obj.get_asset().tags
-                    if text not in tags:
-                        tags.append(text)
+                    asset = obj.get_asset()
+                    if text not in asset.tags:
+                        asset.tags = asset.tags + [text]
                         obj.notify("tags-string")
                 return True
             bitset.foreach(apply_tag, None)
@@ -362,9 +556,9 @@ class PortfolioWindow(Adw.ApplicationWindow):
 
     def remove_tag(self, tag):
         if not self.current_obj: return
-        tags = self.current_obj.get_asset().tags
-        if tag in tags:
-            tags.remove(tag)
+        asset = self.current_obj.get_asset()
+        if tag in asset.tags:
+            asset.tags = [t for t in asset.tags if t != tag]
             self.current_obj.notify("tags-string")
             self.update_tag_view()
 
@@ -383,6 +577,7 @@ class PortfolioWindow(Adw.ApplicationWindow):
                 self.ent_med.set_text(s.medium); self.ent_year.set_text(s.year); self.ent_link.set_text(s.link)
                 self.update_tag_view()
                 self.n_buf.set_text(s.notes)
+                self.update_detail_preview()
                 # Enable inputs
                 self.ent_title.set_sensitive(True)
                 self.sidebar_stack.set_visible_child_name("details")
@@ -393,12 +588,21 @@ class PortfolioWindow(Adw.ApplicationWindow):
             self.ent_title.set_sensitive(False) # Disable title edit
             # We could allow bulk tagging here
             self.update_tag_view() # Clear it since current_obj is None
+            self.update_detail_preview()
             self.sidebar_stack.set_visible_child_name("details")
         else:
             self.current_obj = None
             self.update_tag_view()
             self.sidebar_stack.set_visible_child_name("empty")
 
+    def update_detail_preview(self):
+        obj = self.current_obj
+        path = rendition_path(obj.thumbnail_path, self.detail_preview.get_height_request() * self.get_scale_factor()) if obj else None
+        if path and os.path.exists(path):
+            self.detail_preview.set_filename(path); self.detail_preview.set_visible(True)
+        else:
+            self.detail_preview.set_paintable(None); self.detail_preview.set_visible(False)
+
     def on_edit(self, w, p):
         # Bulk edit support for tags? For now just single
         if self.current_obj:
@@ -427,6 +631,10 @@ class PortfolioWindow(Adw.ApplicationWindow):
         # A more robust solution would check `self.model` state.
         
         # Create new model
+        self.thumbnailer.cancel()
+        self.watcher.clear()
+        self.new_imports.clear()
+        self.close_project_store()
         self.model.clear()
         self.model.metadata.portfolio_title = title
         
@@ -446,19 +654,14 @@ class PortfolioWindow(Adw.ApplicationWindow):
     def on_settings(self, a, p): PersonalInformationDialog(self, self.model).present()
     
     def on_save(self, a, p): 
-        name = self.model.metadata.portfolio_title + ".json" if self.model.metadata.portfolio_title else "portfolio.json"
+        name = (self.model.metadata.portfolio_title or "portfolio") + PROJECT_EXT
         d=Gtk.FileDialog(initial_name=name); d.save(self, None, self.do_save)
     def do_save(self, d, r):
         try:
             f=d.save_finish(r)
             path = f.get_path()
-            payload = {
-                "metadata": self.model.metadata.to_dict(),
-                "assets": [a.to_dict() for a in self.model.get_all_assets()]
-            }
-            with open(path,'w') as o: json.dump(payload, o, indent=4)
+            self.save_project(path, toast="Saved")
             self.project_path = path
-            self.toast_overlay.add_toast(Adw.Toast.new("Saved"))
         except Exception as e: print(e)
 
     def on_import(self, a, p): 
@@ -466,6 +669,7 @@ class PortfolioWindow(Adw.ApplicationWindow):
         filters = Gio.ListStore.new(Gtk.FileFilter)
         f = Gtk.FileFilter()
         f.set_name("Portfolio Files")
+        f.add_pattern("*" + PROJECT_EXT)
         f.add_pattern("*.json")
         filters.append(f)
         d.set_filters(filters)
@@ -478,33 +682,58 @@ class PortfolioWindow(Adw.ApplicationWindow):
         except Exception as e: print(e)
     
     def load_project_file(self, path):
+         self.thumbnailer.cancel()
+         self.watcher.clear()
+         self.new_imports.clear()
+         self.close_project_store()
+         if is_project_store(path):
+             self.project_store = ProjectStore(path)
+             self.model.load(*self.project_store.load())
+             self.check_files()
+             self.project_path = self.saved_path = path
+             self.toast_overlay.add_toast(Adw.Toast.new("Loaded"))
+             return
          with open(path,'r') as i: data=json.load(i)
-         self.model.clear()
-         if isinstance(data, list):
-             for x in data: self.model.add_asset(PortfolioAsset.from_dict(x))
-         else:
-             if "metadata" in data: self.model.metadata = ProjectMetadata.from_dict(data["metadata"])
-             if "assets" in data: 
-                 for x in data["assets"]: self.model.add_asset(PortfolioAsset.from_dict(x))
-         self.project_path = path
+         if isinstance(data, list): data = {"assets": data}
+         meta = ProjectMetadata.from_dict(data["metadata"]) if "metadata" in data else ProjectMetadata()
+         self.model.load(meta, [PortfolioAsset.from_dict(x) for x in data.get("assets", [])])
+         self.check_files()
+         self.project_path = self.saved_path = path
          self.toast_overlay.add_toast(Adw.Toast.new("Loaded"))
 
     # --- EXPORT ---
-    def on_export_html(self, a, p): ensure_templates(); ThemeSelectionDialog(self, lambda path: self.do_export_html(path)).present()
-    def do_export_html(self, t_path): self.pend_t=t_path; d=Gtk.FileDialog(); d.select_folder(self, None, self.fin_export_html)
+    def on_export_html(self, a, p): ensure_templates(); ThemeSelectionDialog(self, lambda path, page_size: self.do_export_html(path, page_size)).present()
+    def do_export_html(self, t_path, page_size): self.pend_t=t_path; self.pend_page_size=page_size; d=Gtk.FileDialog(); d.select_folder(self, None, self.fin_export_html)
     def fin_export_html(self, d, r):
         try: 
             f=d.select_folder_finish(r)
             # Run in thread
             assets = self.model.get_all_assets()
             meta = self.model.metadata
-            threading.Thread(target=self.run_export_html, args=(assets, meta, f.get_path(), self.pend_t)).start()
+            cancel = threading.Event()
+            dialog = ExportProgressDialog(self, "Exporting Website", cancel.set)
+            dialog.present()
+            threading.Thread(target=self.run_export_html, args=(assets, meta, f.get_path(), self.pend_t, self.pend_page_size, dialog, cancel), daemon=True).start()
         except: pass
     
-    def run_export_html(self, assets, meta, out_dir, t_path):
-        GLib.idle_add(lambda: self.toast_overlay.add_toast(Adw.Toast.new("Exporting Website...")))
-        export_portfolio_html(assets, meta, out_dir, t_path)
-        GLib.idle_add(lambda: self.toast_overlay.add_toast(Adw.Toast.new("Website Export Complete")))
+    def run_export_html(self, assets, meta, out_dir, t_path, page_size, dialog, cancel):
+        failed = 0
+        try:
+            failed = export_portfolio_html(assets, meta, out_dir, t_path, progress=lambda d, t: GLib.idle_add(dialog.update, d, t), cancel_event=cancel, page_size=page_size)
+            message = "Website Export Cancelled" if failed is None else "Website Export Complete"
+        except Exception as e:
+            print(f"Website export failed: {e}"); message = "Website Export Failed"
+        GLib.idle_add(self.finish_export, dialog, message, sum(a.missing for a in assets), failed or 0)
+
+    def finish_export(self, dialog, message, missing=0, failed=0):
+        dialog.close()
+        # The exporters pass over sources that are gone or unreadable; say so rather than leave gaps unexplained
+        notes = []
+        if missing: notes.append(f"{missing} missing images skipped")
+        if failed: notes.append(f"{failed} images could not be rendered")
+        if notes: message += f" ({', '.join(notes)})"
+        self.toast_overlay.add_toast(Adw.Toast.new(message))
+        return False
 
     def on_export_pdf(self, a, p): 
         if not HAS_REPORTLAB: self.toast_overlay.add_toast(Adw.Toast.new("Install reportlab first")); return
@@ -514,13 +743,19 @@ class PortfolioWindow(Adw.ApplicationWindow):
             f=d.save_finish(r)
             assets = self.model.get_all_assets()
             meta = self.model.metadata
-            threading.Thread(target=self.run_export_pdf, args=(assets, meta, f.get_path())).start()
+            cancel = threading.Event()
+            dialog = ExportProgressDialog(self, "Exporting PDF", cancel.set)
+            dialog.present()
+            threading.Thread(target=self.run_export_pdf, args=(assets, meta, f.get_path(), dialog, cancel), daemon=True).start()
         except: pass
 
-    def run_export_pdf(self, assets, meta, path):
-        GLib.idle_add(lambda: self.toast_overlay.add_toast(Adw.Toast.new("Exporting PDF...")))
-        export_portfolio_pdf(assets, meta, path)
-        GLib.idle_add(lambda: self.toast_overlay.add_toast(Adw.Toast.new("PDF Export Complete")))
+    def run_export_pdf(self, assets, meta, path, dialog, cancel):
+        try:
+            completed = export_portfolio_pdf(assets, meta, path, dpi=load_settings().get("pdf_dpi", PDF_DPI), progress=lambda d, t: GLib.idle_add(dialog.update, d, t), cancel_event=cancel)
+            message = "PDF Export Complete" if completed else "PDF Export Cancelled"
+        except Exception as e:
+            print(f"PDF export failed: {e}"); message = "PDF Export Failed"
+        GLib.idle_add(self.finish_export, dialog, message, sum(a.missing for a in assets))
 
     # --- THEME & ABOUT ---
     def on_theme(self, a, p):
@@ -556,6 +791,8 @@ class PortfolioWindow(Adw.ApplicationWindow):
         pic=Gtk.Picture(content_fit=Gtk.ContentFit.COVER); pic.set_size_request(-1,240); ov.set_child(pic)
         bx=Gtk.Box(valign=Gtk.Align.END, css_classes=["osd"]); bx.set_size_request(-1,40)
         lbl=Gtk.Label(ellipsize=3, hexpand=True, margin_start=8, margin_end=8); bx.append(lbl); ov.add_overlay(bx)
+        i._missing_icon=Gtk.Image(icon_name="dialog-warning-symbolic", tooltip_text="Source file not found", halign=Gtk.Align.END, valign=Gtk.Align.START,
+                                  margin_top=8, margin_end=8, css_classes=["osd", "error"]); ov.add_overlay(i._missing_icon)
         dr=Gtk.DragSource(actions=Gdk.DragAction.MOVE); dr.connect("prepare", lambda s,x,y,i: Gdk.ContentProvider.new_for_value(i.get_position()), i); fr.add_controller(dr)
         dt=Gtk.DropTarget.new(GObject.TYPE_INT, Gdk.DragAction.MOVE); dt.connect("drop", lambda t,v,x,y,i: self.model.reorder_asset(v, i.get_position()+(1 if x>t.get_widget().get_width()/2 else 0)) or True, i); fr.add_controller(dt)
         
@@ -575,7 +812,7 @@ class PortfolioWindow(Adw.ApplicationWindow):
         if n_press == 2:
             obj = list_item.get_item()
             if obj and obj.source_path:
-                ImageViewerWindow(self, obj).present()
+                ImageViewerWindow(self, obj, self.textures).present()
 
     def on_context_menu(self, gesture, n_press, x, y, list_item):
         obj = list_item.get_item()
@@ -640,27 +877,21 @@ class PortfolioWindow(Adw.ApplicationWindow):
             except: pass
 
     def on_delete_asset(self, obj):
-        # Find index for undo
-        idx = -1
-        store = self.model.store
-        for i in range(store.get_n_items()):
-            if store.get_item(i) == obj:
-                idx = i
-                break
-        
-        self.model.remove_asset_object(obj)
+        # Keeps the position for undo
+        undo_data = self.model.remove_asset_object(obj)
         
-        if idx != -1:
+        if undo_data:
             toast = Adw.Toast.new("Item deleted")
             toast.set_button_label("Undo")
-            toast.connect("button-clicked", lambda t: self.model.insert_asset_object(idx, obj))
+            toast.connect("button-clicked", lambda t: self.restore_items(undo_data))
             self.toast_overlay.add_toast(toast)
 
     def on_rotate(self, obj, angle):
         if obj.source_path and os.path.exists(obj.source_path):
             if rotate_image(obj.source_path, angle):
-                obj.notify("thumbnail-path")
-                # Also force grid update
+                # The rotated file has a new content hash, and so new renditions
+                self.textures.cache.invalidate(obj.source_path)
+                self.queue_thumbnail(obj.get_asset())
                 self.toast_overlay.add_toast(Adw.Toast.new("Image Rotated"))
 
     def on_extract_palette(self, obj):
@@ -673,5 +904,45 @@ class PortfolioWindow(Adw.ApplicationWindow):
 
     def bind_item(self, f, i):
         fr=i.get_child(); ov=fr.get_child(); pic=ov.get_child(); lbl=pic.get_next_sibling().get_first_child(); obj=i.get_item()
-        obj.bind_property("title", lbl, "label", GObject.BindingFlags.SYNC_CREATE)
-        if obj.thumbnail_path and os.path.exists(obj.thumbnail_path): pic.set_filename(obj.thumbnail_path)
+        i._title_binding = obj.bind_property("title", lbl, "label", GObject.BindingFlags.SYNC_CREATE)
+        i._thumb_handler = obj.connect("notify::thumbnail-path", lambda o, p: self.show_card_thumbnail(i, o))
+        i._missing_binding = obj.bind_property("missing", i._missing_icon, "visible", GObject.BindingFlags.SYNC_CREATE)
+        self.show_card_thumbnail(i, obj)
+
+    def unbind_item(self, f, i):
+        # The card goes back to the pool: drop everything tying it to its asset, including the texture
+        obj = i.get_item()
+        i._title_binding.unbind(); i._missing_binding.unbind()
+        if obj: obj.disconnect(i._thumb_handler)
+        if i._texture_load: i._texture_load.cancel()
+        i._texture_load = None
+        # Scrolled away before its thumbnail was made: back to the background queue
+        if obj: self.thumbnailer.demote(obj.source_path)
+        fr=i.get_child(); fr.add_css_class("placeholder"); fr.get_child().get_child().set_paintable(None)
+
+    def show_card_thumbnail(self, i, obj):
+        fr=i.get_child(); pic=fr.get_child().get_child()
+        # A load still running for whatever this card showed before must not land here
+        pending = getattr(i, "_texture_load", None)
+        if pending: pending.cancel()
+        fr.add_css_class("placeholder"); pic.set_paintable(None)
+        # Cards are 240px high with COVER fit: the smallest rendition covering the card is enough
+        path = rendition_path(obj.thumbnail_path, max(fr.get_width(), 240) * fr.get_scale_factor())
+        i._texture_load = None
+        if path: i._texture_load = self.textures.load(path, lambda texture: self.on_card_texture(i, obj, texture))
+        else: self.request_card_thumbnail(i, obj)
+
+    def on_card_texture(self, i, obj, texture):
+        if not texture:
+            # Deleted thumbnail: make it again. One that exists but cannot be read would only fail again
+            if not os.path.exists(obj.thumbnail_path): self.request_card_thumbnail(i, obj)
+            return
+        fr=i.get_child(); fr.remove_css_class("placeholder"); fr.get_child().get_child().set_paintable(texture)
+
+    def request_card_thumbnail(self, i, obj):
+        # On screen goes first; the cards around it are likely next as the user scrolls
+        self.queue_thumbnail(obj.get_asset(), priority=PRIORITY_VISIBLE)
+        pos = i.get_position()
+        for p in range(max(0, pos - THUMBNAIL_NEIGHBOURS), min(pos + THUMBNAIL_NEIGHBOURS + 1, self.filter_model.get_n_items())):
+            other = self.filter_model.get_item(p)
+            if other and p != pos: self.thumbnailer.prioritize(other.source_path, PRIORITY_NEAR)
@@ -1,11 +1,34 @@
 import os
-import hashlib
 import json
 import time
 from PIL import Image
-from .config import CACHE_DIR, RECENT_PROJECTS_FILE, APP_DIR
+from .config import RECENT_PROJECTS_FILE, APP_DIR
+from .cache import ThumbnailCache, DEFAULT_BUDGET_MB, RENDITION_SIZES, LARGE_SIZE
 
 SETTINGS_FILE = os.path.join(APP_DIR, "settings.json")
+IMAGE_EXTENSIONS = frozenset({".png", ".jpg", ".jpeg", ".webp", ".svg"})
+
+def is_image_path(path): return os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS
+
+def scan_images(folder):
+    """Yields the image files below folder, a directory at a time in name order.
+
+    Hidden entries and symlinked directories are skipped, the latter so a link
+    loop cannot keep the walk going forever. Unreadable directories are passed over.
+    """
+    stack = [folder]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it: entries = sorted(it, key=lambda e: e.name)
+        except OSError: continue
+        folders = []
+        for entry in entries:
+            if entry.name.startswith("."): continue
+            try:
+                if entry.is_dir(follow_symlinks=False): folders.append(entry.path)
+                elif is_image_path(entry.name) and entry.is_file(): yield entry.path
+            except OSError: pass
+        stack.extend(reversed(folders))
 
 def load_settings():
     if not os.path.exists(SETTINGS_FILE):
@@ -79,18 +102,111 @@ def remove_recent_project(path):
     projects = [p for p in projects if p.get('path') != path]
     save_recent_projects(projects)
 
+def fit_size(size, max_px, cover=False):
+    """Size that fits in max_px x max_px, or with cover=True whose short side is max_px (panoramas capped at 3x). Never upscales."""
+    w, h = size
+    scale = max_px / max(w, h)
+    if cover: scale = min(max_px / min(w, h), scale * 3)
+    scale = min(scale, 1.0)
+    return (max(1, round(w * scale)), max(1, round(h * scale)))
+
+def resize_to(img, max_px, cover=False):
+    size = fit_size(img.size, max_px, cover)
+    if size == img.size: return img
+    # reducing_gap: cheap integer box reduce() first, Lanczos only covers the last <2x
+    return img.resize(size, Image.LANCZOS, reducing_gap=2.0)
+
+def decode_to_size(path, max_px, cover=False):
+    """Decodes path into an RGB image sized as by fit_size, doing as little decoding work as possible."""
+    with Image.open(path) as img:
+        if img.format == "JPEG":
+            # DCT scaling: libjpeg decodes straight to 1/2, 1/4 or 1/8 size, never below the target.
+            # Asked with the target's real shape, a square box would stop it a scale step early
+            img.draft("RGB", fit_size(img.size, max_px, cover))
+        if img.mode == "P": img = img.convert("RGB")
+        img = resize_to(img, max_px, cover)
+        # Convert after resizing so RGBA/CMYK/16-bit sources are converted at target size
+        if img.mode != "RGB": img = img.convert("RGB")
+        img.load()
+        return img
+
+_thumb_cache = None
+
+def get_thumbnail_cache():
+    # One index connection per process; the disk budget comes from settings.json
+    global _thumb_cache
+    if _thumb_cache is None:
+        _thumb_cache = ThumbnailCache(budget_mb=load_settings().get("thumbnail_cache_mb", DEFAULT_BUDGET_MB))
+    return _thumb_cache
+
+def dhash(img):
+    """64-bit difference hash of img as 16 hex digits: re-encoded, resized or lightly edited copies land a few bits apart."""
+    # 9x8 grey, then one bit per horizontal neighbour pair: is the left one brighter
+    px = img.convert("L").resize((9, 8), Image.BOX).tobytes()
+    bits = 0
+    for row in range(0, 72, 9):
+        for x in range(row, row + 8): bits = bits << 1 | (px[x] > px[x + 1])
+    return f"{bits:016x}"
+
 def generate_thumbnail(source_path, force=False):
+    """Builds every rendition in RENDITION_SIZES from a single decode.
+
+    Returns (THUMBNAIL_SIZE rendition path, dhash of the picture), or (None, None) on failure.
+    """
     try:
-        path_hash = hashlib.md5(source_path.encode('utf-8')).hexdigest()
-        thumb_filename = f"{path_hash}.jpg"
-        thumb_path = os.path.join(CACHE_DIR, thumb_filename)
-        if os.path.exists(thumb_path) and not force: return thumb_path
-        with Image.open(source_path) as img:
-            if img.mode in ("RGBA", "P"): img = img.convert("RGB")
-            img.thumbnail((600, 600)) 
-            img.save(thumb_path, "JPEG", quality=85)
-        return thumb_path
-    except: return None
+        cache = get_thumbnail_cache()
+        thumb_path, digest = cache.lookup(source_path)
+        if thumb_path and not force: return thumb_path, rendition_hash(cache, digest)
+        img = decode_to_size(source_path, RENDITION_SIZES[-1], cover=True)
+        # Largest first, each smaller rendition is resized from the previous one
+        for px in reversed(RENDITION_SIZES):
+            img = resize_to(img, px, cover=True)
+            save_rendition(img, cache.path_for(digest, px))
+        hashed = rendition_hash(cache, digest) # Before store(), whose eviction could take it
+        cache.store(digest)
+        return cache.path_for(digest), hashed
+    except: return None, None
+
+def rendition_hash(cache, digest):
+    # Always from the saved smallest rendition, never the image before JPEG encoding, so a
+    # picture hashes the same whether its thumbnail was just made or found in the cache
+    with Image.open(cache.path_for(digest, RENDITION_SIZES[0])) as img: return dhash(img)
+
+def rendition_path(thumbnail_path, px):
+    """Smallest cached rendition of thumbnail_path whose short side covers px."""
+    if not thumbnail_path: return thumbnail_path
+    stem, ext = os.path.splitext(thumbnail_path)
+    base, sep, size = stem.rpartition("_")
+    if not sep or not size.isdigit(): return thumbnail_path # Pre-pyramid thumbnail
+    size = next((s for s in RENDITION_SIZES if s >= px), RENDITION_SIZES[-1])
+    return f"{base}_{size}{ext}"
+
+def save_rendition(img, out):
+    tmp_path = f"{out}.{os.getpid()}.tmp"
+    img.save(tmp_path, "JPEG", quality=85)
+    # Atomic so another worker never sees a half-written shared thumbnail
+    os.replace(tmp_path, out)
+
+def source_for_size(source_path, px):
+    """Cheapest file to decode for output no larger than px: a current cached rendition if one covers it, else the original.
+
+    The LARGE_SIZE rendition is made here the first time an export needs it, from
+    the one decode of the original it would have done anyway, so later exports
+    of the same picture read the small file. Renditions are q85 JPEGs, fine as a
+    source for screen output but not for print: the PDF export decodes originals.
+    """
+    if px > LARGE_SIZE: return source_path
+    try:
+        cache = get_thumbnail_cache()
+        thumb_path, digest = cache.lookup(source_path)
+        if not thumb_path: return source_path
+        if px <= RENDITION_SIZES[-1]: return rendition_path(thumb_path, px)
+        large = cache.path_for(digest, LARGE_SIZE)
+        if not os.path.exists(large):
+            save_rendition(decode_to_size(source_path, LARGE_SIZE, cover=True), large)
+            cache.store(digest)
+        return large
+    except OSError: return source_path
 
 def rotate_image(path, angle):
     try:
@@ -100,7 +216,7 @@ def rotate_image(path, angle):
             # PIL: rotate(90) is CCW. So -90 is CW.
             rotated = img.rotate(-angle, expand=True)
             rotated.save(path)
-        generate_thumbnail(path, force=True)
+        # No thumbnail here: the caller queues one, the file now hashes to fresh renditions
         return True
     except Exception as e:
         print(f"Rotation failed: {e}")
@@ -108,7 +224,7 @@ def rotate_image(path, angle):
 
 def extract_palette(path, num_colors=5):
     try:
-        with Image.open(path) as img:
+        with decode_to_size(path, 300) as img:
             img = img.resize((150, 150))
             result = img.quantize(colors=num_colors)
             palette = result.getpalette()
@@ -0,0 +1,57 @@
+import os
+from gi.repository import Gio, GLib
+
+# Quiet time after the last event before a file is looked at again
+DEBOUNCE_MS = 500
+
+class SourceWatcher:
+    """Watches project source files through one Gio.FileMonitor per directory.
+
+    Events are coalesced per file and reported once nothing happened for
+    DEBOUNCE_MS, as on_change(changed, removed) on the main loop: sets of
+    watched paths that exist again or are gone. An editor saving through a
+    temporary file and a rename, or a batch export, is one call. Events for
+    files that are not watched are ignored.
+    """
+    def __init__(self, on_change):
+        self.on_change = on_change
+        self._dirs = {} # directory -> (Gio.FileMonitor, {watched paths in it})
+        self._pending = set()
+        self._timeout = 0
+
+    def watch(self, paths):
+        for path in paths:
+            if not path: continue
+            folder = os.path.dirname(path)
+            entry = self._dirs.get(folder)
+            if entry is None:
+                try: monitor = Gio.File.new_for_path(folder).monitor_directory(Gio.FileMonitorFlags.WATCH_MOVES, None)
+                except GLib.Error: continue # Folder gone or not watchable: nothing to report from it
+                monitor.connect("changed", self._on_event, folder)
+                entry = self._dirs[folder] = (monitor, set())
+            entry[1].add(path)
+
+    def clear(self):
+        for monitor, _ in self._dirs.values(): monitor.cancel()
+        self._dirs.clear()
+        self._pending.clear()
+        if self._timeout: GLib.source_remove(self._timeout); self._timeout = 0
+
+    def _on_event(self, monitor, file, other, event, folder):
+        if event == Gio.FileMonitorEvent.ATTRIBUTE_CHANGED: return
+        watched = self._dirs[folder][1]
+        path = file.get_path()
+        if path == folder: self._pending |= watched # The folder itself was moved or deleted
+        elif path in watched: self._pending.add(path)
+        if other is not None and other.get_path() in watched: self._pending.add(other.get_path())
+        if not self._pending: return
+        # Every event restarts the wait, so a file being written is only looked at once it settles
+        if self._timeout: GLib.source_remove(self._timeout)
+        self._timeout = GLib.timeout_add(DEBOUNCE_MS, self._flush)
+
+    def _flush(self):
+        self._timeout = 0
+        paths, self._pending = self._pending, set()
+        removed = {p for p in paths if not os.path.exists(p)}
+        self.on_change(paths - removed, removed)
+        return False
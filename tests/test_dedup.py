@@ -0,0 +1,62 @@
+import random
+import itertools
+from src.dedup import HammingIndex, DUPLICATE_DISTANCE, group_duplicates, hamming
+
+def near(rnd, h, bits):
+    for bit in rnd.sample(range(64), bits): h ^= 1 << bit
+    return h
+
+def make_hashes(rnd, count):
+    # Random hashes plus chains and clusters of near copies, some at exactly DUPLICATE_DISTANCE
+    hashes = {f"r{n}": rnd.getrandbits(64) for n in range(count)}
+    for n in range(count // 10):
+        h = hashes[f"r{n}"]
+        for step in range(rnd.randint(1, 4)):
+            h = near(rnd, h, rnd.randint(0, DUPLICATE_DISTANCE))
+            hashes[f"r{n}-{step}"] = h
+    return hashes
+
+def brute_groups(hashes):
+    parent = {i: i for i in hashes}
+    def root(i):
+        while parent[i] != i: i = parent[i]
+        return i
+    for a, b in itertools.combinations(hashes, 2):
+        if hamming(hashes[a], hashes[b]) <= DUPLICATE_DISTANCE: parent[root(a)] = root(b)
+    groups = {}
+    for i in hashes: groups.setdefault(root(i), set()).add(i)
+    return {frozenset(g) for g in groups.values() if len(g) > 1}
+
+def test_search_matches_linear_scan():
+    rnd = random.Random(1)
+    hashes = make_hashes(rnd, 400)
+    index = HammingIndex()
+    for item, h in hashes.items(): index.add(h, item)
+    for item, h in hashes.items():
+        expected = {(hamming(h, o), i) for i, o in hashes.items() if hamming(h, o) <= DUPLICATE_DISTANCE}
+        assert set(index.search(h)) == expected
+
+def test_search_after_discard():
+    rnd = random.Random(2)
+    hashes = make_hashes(rnd, 200)
+    index = HammingIndex()
+    for item, h in hashes.items(): index.add(h, item)
+    for item in rnd.sample(sorted(hashes), 100): index.discard(hashes.pop(item), item)
+    for h in hashes.values():
+        expected = {i for i, o in hashes.items() if hamming(h, o) <= DUPLICATE_DISTANCE}
+        assert {i for _, i in index.search(h)} == expected
+
+def test_groups_match_brute_force():
+    for trial in range(20):
+        rnd = random.Random(trial)
+        hashes = make_hashes(rnd, 150)
+        assert {frozenset(g) for g in group_duplicates(hashes)} == brute_groups(hashes), trial
+
+def test_groups_follow_chains():
+    # Each step is DUPLICATE_DISTANCE bits, so a and d are far apart but linked through b and c
+    a = 0
+    b = a ^ 0b111111
+    c = b ^ (0b111111 << 6)
+    d = c ^ (0b111111 << 12)
+    hashes = {"a": a, "b": b, "c": c, "d": d, "same": d, "far": ~a & (2 ** 64 - 1)}
+    assert sorted(map(sorted, group_duplicates(hashes))) == [["a", "b", "c", "d", "same"]]
@@ -0,0 +1,60 @@
+import random
+import pytest
+
+try: from src.models import ProjectModel, PortfolioAsset, SortedAssetView, SORT_MANUAL, SORT_TITLE, SORT_YEAR
+except (ImportError, ValueError): pytest.skip("needs PyGObject with GTK 4", allow_module_level=True)
+
+def make_asset(rnd): return PortfolioAsset(title=f"T{rnd.randrange(500)}", year=str(rnd.randrange(1990, 2025)))
+
+def listen(view):
+    # A copy of the view rebuilt only from its items-changed signals, as the grid sees it
+    mirror, resets = [], [0]
+    def on_changed(v, pos, removed, added):
+        assert pos + removed <= len(mirror)
+        if added and removed == len(mirror) > 0: resets[0] += 1
+        del mirror[pos:pos + removed]
+        assert v.get_n_items() == len(mirror) + added # Count matches at every step, not just the last
+        mirror[pos:pos] = [v.get_item(i).get_asset() for i in range(pos, pos + added)]
+    view.connect("items-changed", on_changed)
+    return mirror, resets
+
+def random_step(rnd, model):
+    n = model.store.get_n_items()
+    op = rnd.randrange(5)
+    if op == 0: model.add_assets([make_asset(rnd) for _ in range(rnd.randrange(1, 50))])
+    elif op == 1:
+        removed = model.remove_asset_objects([model.store.wrap(model.store.get_asset(rnd.randrange(n))) for _ in range(rnd.randrange(1, 20))])
+        if rnd.random() < 0.5: model.restore_asset_objects(removed)
+    elif op == 2:
+        obj = model.store.wrap(model.store.get_asset(rnd.randrange(n)))
+        if rnd.random() < 0.5: obj.title = f"T{rnd.randrange(500)}"
+        else: obj.year = str(rnd.randrange(1990, 2025))
+    elif op == 3: model.reorder_asset(rnd.randrange(n), rnd.randrange(n))
+    else: model.store.wrap(model.store.get_asset(rnd.randrange(n))).notes = "edited"
+
+@pytest.mark.parametrize("mode", [SORT_TITLE, SORT_YEAR])
+def test_view_follows_store_in_place(mode):
+    rnd = random.Random(mode)
+    model = ProjectModel()
+    view = SortedAssetView(model)
+    model.add_assets([make_asset(rnd) for _ in range(300)])
+    view.set_mode(mode)
+    mirror, resets = listen(view)
+    mirror[:] = [view.get_item(i).get_asset() for i in range(view.get_n_items())]
+    for step in range(200):
+        random_step(rnd, model)
+        expected = sorted(model.store.assets(), key=lambda a: view._key(a))
+        got = [view.get_item(i).get_asset() for i in range(view.get_n_items())]
+        assert got == expected and all(g is e for g, e in zip(got, expected)), step
+        assert len(mirror) == len(got) and all(m is g for m, g in zip(mirror, got)), step
+    assert resets[0] == 0
+
+def test_manual_passes_store_through():
+    rnd = random.Random(0)
+    model = ProjectModel()
+    view = SortedAssetView(model)
+    mirror, _ = listen(view)
+    for _ in range(100): random_step(rnd, model) if model.store.get_n_items() else model.add_assets([make_asset(rnd)])
+    view.set_mode(SORT_TITLE)
+    view.set_mode(SORT_MANUAL)
+    assert mirror == model.store.assets()